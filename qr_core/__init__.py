@@ -0,0 +1,59 @@
+# Núcleo sem interface gráfica. Os nomes abaixo são carregados sob demanda
+# (PEP 562): "from qr_core import get_wifi_string" não importa Pillow,
+# qrcode nem NumPy, o que importa para workers de vida curta.
+from importlib import import_module
+
+_NOMES = {
+    "HAS_PIX": ".payloads",
+    "get_mailto_string": ".payloads",
+    "get_pix_string": ".payloads",
+    "get_tel_string": ".payloads",
+    "get_vcard_string": ".payloads",
+    "get_wifi_string": ".payloads",
+    "CacheDisco": ".cache",
+    "LRUCache": ".cache",
+    "base64_imagem_async": ".assincrono",
+    "bytes_imagem_async": ".assincrono",
+    "configurar_executor": ".assincrono",
+    "encerrar_executor": ".assincrono",
+    "gerar_lote_async": ".assincrono",
+    "gerar_qrcode_async": ".assincrono",
+    "renderizar_job_async": ".assincrono",
+    "EscritorPdf": ".export",
+    "EscritorPng": ".export",
+    "EscritorTiff": ".export",
+    "EscritorZip": ".export",
+    "LayoutFolha": ".folha",
+    "compor_folhas": ".folha",
+    "salvar_imagem": ".export",
+    "salvar_pdf": ".export",
+    "gerar_svg": ".svg",
+    "aquecer_logos": ".logo",
+    "cache_logos": ".logo",
+    "carregar_logo": ".logo",
+    "Estatisticas": ".metricas",
+    "adicionar_hook": ".metricas",
+    "ativar": ".metricas",
+    "remover_hook": ".metricas",
+    "PixRecebedor": ".pix",
+    "recebedor": ".pix",
+    "HAS_NUMPY": ".raster",
+    "renderizar_matriz": ".raster",
+    "cache_matrizes": ".render",
+    "codificar": ".render",
+    "gerar_qrcode": ".render",
+    "renderizar": ".render",
+}
+
+__all__ = list(_NOMES)
+
+def __getattr__(nome):
+    modulo = _NOMES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(import_module(modulo, __name__), nome)
+    globals()[nome] = valor
+    return valor
+
+def __dir__():
+    return sorted(set(globals()) | set(_NOMES))
@@ -0,0 +1,121 @@
+import asyncio
+import base64
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .batch import _executar_job, renderizar_job
+from .export import bytes_imagem
+from .render import gerar_qrcode
+
+# API asyncio: as corrotinas rodam o trabalho pesado (render, PNG) num
+# executor compartilhado e limitado, e o event loop só espera. Um semáforo por
+# loop limita os renders em andamento + na fila do executor: milhares de
+# corrotinas criadas de uma vez esperam no semáforo, não como tarefas
+# acumuladas no executor.
+#
+# Cancelar uma corrotina tira o render da fila se ele ainda não começou; um
+# render já em execução termina na thread e o resultado é descartado.
+
+_executor = None
+_max_workers = None
+_limite = None
+_semaforos = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+def configurar_executor(max_workers=None, limite=None, executor=None):
+    # executor: um concurrent.futures.Executor próprio (ex.: ProcessPoolExecutor
+    # para renders longos com engine="styled"); o executor anterior é encerrado
+    global _executor, _max_workers, _limite
+    with _lock:
+        antigo, _executor = _executor, executor
+        _max_workers = max_workers
+        _limite = limite
+        _semaforos.clear()
+    if antigo is not None:
+        antigo.shutdown(wait=False)
+
+def encerrar_executor(wait=True):
+    global _executor
+    with _lock:
+        antigo, _executor = _executor, None
+    if antigo is not None:
+        antigo.shutdown(wait=wait)
+
+def _executor_atual():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_workers or os.cpu_count() or 1,
+                                           thread_name_prefix="qr_core")
+        return _executor
+
+def _semaforo(loop):
+    with _lock:
+        sem = _semaforos.get(loop)
+        if sem is None:
+            limite = _limite or (_max_workers or os.cpu_count() or 1) * 4
+            sem = _semaforos[loop] = asyncio.Semaphore(limite)
+        return sem
+
+async def _executar(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    async with _semaforo(loop):
+        return await loop.run_in_executor(_executor_atual(), partial(fn, *args, **kwargs))
+
+async def gerar_qrcode_async(data, **opcoes):
+    # mesmos parâmetros de gerar_qrcode; devolve a imagem PIL
+    return await _executar(gerar_qrcode, data, **opcoes)
+
+async def bytes_imagem_async(img, formato="png", **opcoes):
+    return await _executar(bytes_imagem, img, formato, **opcoes)
+
+async def base64_imagem_async(img, formato="png", **opcoes):
+    # o "Copiar" do app: PNG em base64, codificado fora do loop
+    return await _executar(_base64_imagem, img, formato, **opcoes)
+
+def _base64_imagem(img, formato, **opcoes):
+    return base64.b64encode(bytes_imagem(img, formato, **opcoes)).decode()
+
+async def renderizar_job_async(job, formato="png", compress_level=6):
+    # job no formato do lote (tipo + campos, ou data); devolve os bytes finais
+    return await _executar(renderizar_job, job, formato, compress_level)
+
+async def gerar_lote_async(jobs, concorrencia=None, compress_level=6, cache_disco=None):
+    # iterador assíncrono: devolve o resultado de cada job (o mesmo dict do
+    # lote, com "dados" nos sucessos) na ordem em que ficam prontos. jobs pode
+    # ser um iterável comum ou assíncrono; só `concorrencia` jobs ficam em
+    # andamento, então a memória não cresce com o tamanho da entrada. Sair do
+    # async for (ou cancelar quem itera) cancela os pendentes.
+    concorrencia = concorrencia or _limite or (_max_workers or os.cpu_count() or 1) * 4
+    pendentes = set()
+
+    async def _job(indice, job):
+        return await _executar(_executar_job, (indice, job, None, compress_level, cache_disco))
+
+    try:
+        indice = 0
+        async for job in _iterar(jobs):
+            if len(pendentes) >= concorrencia:
+                prontos, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in prontos:
+                    yield tarefa.result()
+            pendentes.add(asyncio.ensure_future(_job(indice, job)))
+            indice += 1
+        while pendentes:
+            prontos, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+            for tarefa in prontos:
+                yield tarefa.result()
+    finally:
+        for tarefa in pendentes:
+            tarefa.cancel()
+
+async def _iterar(jobs):
+    if hasattr(jobs, "__aiter__"):
+        async for job in jobs:
+            yield job
+    else:
+        for job in jobs:
+            yield job
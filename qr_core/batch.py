@@ -0,0 +1,397 @@
+import argparse
+import csv
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+
+from PIL import ImageColor
+
+from .cache import CacheDisco
+from .export import SVG_OPCOES, EscritorZip, bytes_imagem, formato_de
+from .logo import aquecer_logos, hash_logo
+from .capacidade import planejar
+from .payloads import (
+    get_mailto_string,
+    get_pix_string,
+    get_tel_string,
+    get_vcard_string,
+    get_wifi_string,
+)
+from .render import codificar, gerar_qrcode
+from .svg import gerar_svg
+
+# tipo -> (construtor do payload, campos usados, na ordem dos argumentos)
+TIPOS = {
+    "texto": (str, ("text",)),
+    "url": (str, ("url",)),
+    "telefone": (get_tel_string, ("tel",)),
+    "wifi": (get_wifi_string, ("ssid", "password", "crypto")),
+    "email": (get_mailto_string, ("email",)),
+    "vcard": (get_vcard_string, ("name", "tel", "email")),
+    "pix": (get_pix_string, ("chave", "nome", "cidade", "valor", "txid")),
+}
+
+def _bool(v):
+    if isinstance(v, bool):
+        return v
+    return str(v).strip().lower() in ("1", "true", "sim", "s", "yes", "y")
+
+# opções de estilo aceitas por job -> conversão (CSV só traz strings)
+ESTILO = {
+    "size": int,
+    "fg_color": str,
+    "bg_color": str,
+    "border": int,
+    "module_style": str,
+    "logo_path": str,
+    "auto_resize_logo": _bool,
+    "error_correction": str,
+    "box_size": int,
+    "render_mode": str,
+    "engine": str,
+    "version": int,
+    "mask_pattern": int,
+    "image_mode": str,
+}
+
+def ler_jobs(path):
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext == ".csv":
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for linha in f:
+                linha = linha.strip()
+                if linha:
+                    yield json.loads(linha)
+
+def montar_payload(job):
+    if job.get("data"):
+        return job["data"]
+    tipo = (job.get("tipo") or "texto").strip().lower()
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo desconhecido: {tipo}")
+    builder, campos = TIPOS[tipo]
+    return builder(*[job.get(c) or "" for c in campos])
+
+def opcoes_estilo(job):
+    opts = {}
+    for k, conv in ESTILO.items():
+        v = job.get(k)
+        if v is None or v == "":
+            continue
+        opts[k] = conv(v)
+    return opts
+
+# Deduplicação: linhas que, normalizadas, dão o mesmo payload com o mesmo
+# estilo e formato geram um único render; os demais arquivos viram hardlinks
+# (ou cópias) do primeiro. Só a chave (sha256) e o nome do primeiro arquivo
+# ficam em memória por saída distinta.
+
+_SEGURANCA_WIFI = {"wpa": "WPA", "wep": "WEP", "nopass": "nopass"}
+_SEPARADORES_TEL = str.maketrans("", "", " -.()")
+
+def normalizar_job(job):
+    # mesma semântica, grafia canônica: espaços nas pontas dos campos
+    # estruturados, separadores visuais do telefone (RFC 3966), caixa do tipo
+    # de segurança Wi-Fi e do domínio do e-mail. "data" e "text" ficam como vieram.
+    # No JSONL os campos podem vir como número ("tel": 11999999999): viram texto,
+    # como aconteceria ao montar o payload.
+    job = dict(job)
+    tipo = str(job.get("tipo") or "texto").strip().lower()
+    if job.get("data") or tipo not in TIPOS:
+        return job
+    job["tipo"] = tipo
+    for campo in TIPOS[tipo][1]:
+        if campo != "text" and job.get(campo):
+            job[campo] = str(job[campo]).strip()
+    if job.get("tel"):
+        job["tel"] = job["tel"].translate(_SEPARADORES_TEL)
+    if job.get("crypto"):
+        job["crypto"] = _SEGURANCA_WIFI.get(job["crypto"].lower(), job["crypto"])
+    if job.get("email") and "@" in job["email"]:
+        local, dominio = job["email"].rsplit("@", 1)
+        job["email"] = f"{local}@{dominio.lower()}"
+    return job
+
+# entra na chave: mudar quando o render passar a gerar bytes diferentes para
+# as mesmas opções (invalida o cache em disco)
+VERSAO_CHAVE = 1
+
+@lru_cache(maxsize=None)
+def _padroes_render():
+    # valores padrão de gerar_qrcode: omitir uma opção ou passar o padrão dá a mesma imagem
+    return {
+        nome: p.default for nome, p in inspect.signature(gerar_qrcode).parameters.items()
+        if p.default is not inspect.Parameter.empty
+    }
+
+def chave_job(job, formato="png", compress_level=6):
+    # hash de (formato, payload, estilo completo, conteúdo do logo): chave da
+    # deduplicação e do cache em disco
+    data = montar_payload(job)
+    opts = dict(_padroes_render(), **opcoes_estilo(job))
+    for k in ("fg_color", "bg_color"):
+        opts[k] = "#" + "".join(f"{c:02X}" for c in ImageColor.getrgb(opts[k]))
+    if opts.get("logo_path"):
+        opts["logo_path"] = hash_logo(opts["logo_path"])
+    texto = json.dumps([VERSAO_CHAVE, formato, compress_level, data, sorted(opts.items())],
+                       ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode()).digest()
+
+def _deduplicar(tarefas, vistos, copias):
+    # repassa só a primeira tarefa de cada chave; as repetidas vão para
+    # `copias` como (indice, arquivo, arquivo de origem)
+    for indice, job, *resto in tarefas:
+        arquivo = _nome_arquivo(indice, job)
+        try:
+            job = normalizar_job(job)
+            chave = chave_job(job, formato_de(arquivo))
+        except Exception:
+            chave = None  # inválido: segue para o render, que reporta o erro
+        if chave is not None:
+            origem = vistos.setdefault(chave, arquivo)
+            if origem != arquivo:
+                copias.append((indice, arquivo, origem))
+                continue
+        yield indice, job, *resto
+
+def _replicar(origem, destino, modo):
+    if os.path.lexists(destino):
+        os.remove(destino)
+    if modo == "link":
+        try:
+            os.link(origem, destino)
+            return
+        except OSError:
+            pass  # sistema de arquivos sem hardlink: copia
+    shutil.copyfile(origem, destino)
+
+def renderizar_job(job, formato="png", compress_level=6):
+    data = montar_payload(job)
+    if not data:
+        raise ValueError("Payload vazio")
+    opts = opcoes_estilo(job)
+    if formato == "svg":
+        cod = codificar(data, opts.get("error_correction", "H"), opts.get("version"),
+                        mask_pattern=opts.get("mask_pattern"))
+        return gerar_svg(cod, **{k: opts[k] for k in SVG_OPCOES if k in opts}).encode()
+    return bytes_imagem(gerar_qrcode(data, **opts), formato, compress_level=compress_level)
+
+def versao_do_lote(jobs):
+    # menor versão que comporta todos os jobs válidos (como capacidade.versao_comum,
+    # mas job a job: os inválidos, inclusive os grandes demais para qualquer
+    # versão, ficam de fora e falham depois, no render, com o erro de sempre)
+    versao = 1
+    for job in jobs:
+        try:
+            data = montar_payload(job)
+            if data:
+                ec = opcoes_estilo(job).get("error_correction", "H")
+                versao = max(versao, planejar(data, ec).version)
+        except Exception:
+            continue
+    return versao
+
+def _nome_arquivo(indice, job):
+    return job.get("arquivo") or f"{indice:06d}.png"
+
+def _caminho_saida(saida, arquivo):
+    # "arquivo" pode ter subpastas (criadas aqui), mas não sair de `saida`:
+    # caminhos absolutos e ".." são recusados, no diretório e no ZIP (saida None)
+    partes = arquivo.replace("\\", "/").split("/")
+    if os.path.isabs(arquivo) or os.path.splitdrive(arquivo)[0] or ".." in partes or not partes[-1]:
+        raise ValueError(f"Nome de arquivo inválido: {arquivo}")
+    if saida is None:
+        return None
+    caminho = os.path.join(saida, *partes)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    return caminho
+
+# CacheDisco do processo worker, recebido uma vez no initializer. Mandado em
+# cada tarefa, cada chunk desserializava uma cópia nova, sem a estimativa de
+# tamanho, e recontava o diretório do cache no primeiro put.
+_disco_worker = None
+
+def _iniciar_worker(logos, disco):
+    global _disco_worker
+    _disco_worker = disco
+    aquecer_logos(logos)
+
+def _executar_job(args):
+    indice, job, saida, compress_level, disco = args
+    if disco is None:
+        disco = _disco_worker
+    arquivo = _nome_arquivo(indice, job)
+    formato = formato_de(arquivo)
+    r = {"indice": indice, "arquivo": arquivo, "ok": True}
+    try:
+        destino = _caminho_saida(saida, arquivo)
+        chave = dados = None
+        if disco is not None:
+            chave = chave_job(job, formato, compress_level)
+            if destino is not None and disco.copiar(chave, destino):
+                return dict(r, cache=True)
+            dados = disco.get(chave)
+            r["cache"] = dados is not None
+        if dados is None:
+            dados = renderizar_job(job, formato, compress_level)
+            if disco is not None:
+                disco.put(chave, dados)
+        if saida is None:
+            # modo ZIP: os bytes voltam para o processo principal gravar
+            return dict(r, dados=dados)
+        with open(destino, "wb") as f:
+            f.write(dados)
+        return r
+    except Exception as e:
+        return {"indice": indice, "arquivo": arquivo, "ok": False, "erro": f"{type(e).__name__}: {e}"}
+
+def _mapear(ex, fn, tarefas, chunksize, janela):
+    # Executor.map envia tudo de uma vez; em janelas, a leitura dos jobs e os
+    # resultados pendentes ficam limitados mesmo com milhões de linhas
+    tarefas = iter(tarefas)
+    while True:
+        bloco = list(itertools.islice(tarefas, janela))
+        if not bloco:
+            return
+        yield from ex.map(fn, bloco, chunksize=chunksize)
+
+def gerar_lote(jobs, saida, workers=None, chunksize=16, logos=(), compress_level=6, deduplicar=None,
+               cache_disco=None):
+    # saida: diretório, ou arquivo .zip para gravar tudo num único pacote.
+    # deduplicar: None, "link" (hardlink, com cópia de reserva) ou "copia".
+    # cache_disco: CacheDisco compartilhado entre execuções (acerto = cópia do arquivo)
+    em_zip = str(saida).lower().endswith(".zip")
+    if em_zip:
+        os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    else:
+        os.makedirs(saida, exist_ok=True)
+    # com processos, o cache vai para os workers pelo initializer (ver _disco_worker)
+    disco_tarefa = cache_disco if workers == 1 else None
+    tarefas = ((i, job, None if em_zip else saida, compress_level, disco_tarefa) for i, job in enumerate(jobs))
+    vistos, copias = {}, []
+    if deduplicar:
+        tarefas = _deduplicar(tarefas, vistos, copias)
+
+    total, acertos, falhas = 0, 0, []
+    inicio = time.perf_counter()
+    with (EscritorZip(saida) if em_zip else nullcontext()) as pacote, _pool(workers, logos, cache_disco) as ex:
+        if ex is None:
+            resultados = map(_executar_job, tarefas)
+        else:
+            resultados = _mapear(ex, _executar_job, tarefas, chunksize, chunksize * 64)
+        for r in resultados:
+            total += 1
+            acertos += r.get("cache", False)
+            if not r["ok"]:
+                falhas.append(r)
+            elif em_zip:
+                pacote.adicionar(r["arquivo"], r.pop("dados"))
+
+        # repetidos: depois de todos os renders, quando as origens já existem
+        erros = {f["arquivo"]: f["erro"] for f in falhas}
+        renders, falhas_render = total, len(falhas)
+        for indice, arquivo, origem in copias:
+            total += 1
+            try:
+                if origem in erros:
+                    raise RuntimeError(f"origem {origem} falhou: {erros[origem]}")
+                destino = _caminho_saida(None if em_zip else saida, arquivo)
+                if em_zip:
+                    pacote.replicar(arquivo, origem)
+                else:
+                    _replicar(_caminho_saida(saida, origem), destino, deduplicar)
+            except Exception as e:
+                falhas.append({"indice": indice, "arquivo": arquivo, "ok": False, "erro": f"{type(e).__name__}: {e}"})
+    segundos = time.perf_counter() - inicio
+
+    relatorio = {
+        "total": total,
+        "sucesso": total - len(falhas),
+        "falhas": falhas,
+        "segundos": round(segundos, 3),
+        "por_segundo": round(total / segundos, 1) if segundos else 0.0,
+    }
+    if deduplicar:
+        relatorio["deduplicacao"] = {
+            "renders": renders,
+            "repetidos": len(copias),
+            "razao": round(total / renders, 2) if renders else 1.0,
+        }
+    if cache_disco is not None:
+        relatorio["cache_disco"] = {"acertos": acertos, "renders": renders - acertos - falhas_render}
+    return relatorio
+
+def _pool(workers, logos, disco=None):
+    if workers == 1:
+        aquecer_logos(logos)
+        return nullcontext()
+    return ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker, initargs=(tuple(logos), disco))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geração de QR Codes em lote (CSV/JSONL)")
+    parser.add_argument("entrada", help="arquivo .csv ou .jsonl com os jobs")
+    parser.add_argument("saida", help="diretório de saída, ou arquivo .zip")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument("-c", "--chunksize", type=int, default=16, help="jobs por lote enviado a cada processo")
+    parser.add_argument("--compress-level", type=int, default=6, help="nível de compressão PNG (0-9)")
+    parser.add_argument("--logo", action="append", default=[], help="logo a pré-carregar em cada worker (repetível)")
+    parser.add_argument("--relatorio", default=None, help="caminho do relatório JSON (padrão: <saida>/relatorio.json)")
+    parser.add_argument("--versao", default=None,
+                        help="versão QR fixa para todos os jobs (1-40), ou 'lote' para a menor que serve a todos")
+    parser.add_argument("--mascara", type=int, default=None,
+                        help="máscara QR fixa (0-7) para todos os jobs; pula a avaliação das 8 máscaras")
+    parser.add_argument("--deduplicar", nargs="?", const="link", default=None, choices=("link", "copia"),
+                        help="renderizar uma vez cada payload+estilo repetido e replicar o arquivo "
+                             "(link = hardlink, padrão; copia = cópia)")
+    parser.add_argument("--cache-disco", default=None, metavar="DIR",
+                        help="cache persistente dos arquivos gerados, reaproveitado entre execuções")
+    parser.add_argument("--cache-disco-mb", type=int, default=512, help="limite do cache em disco em MB")
+    args = parser.parse_args(argv)
+
+    jobs = ler_jobs(args.entrada)
+    if args.versao:
+        # uma leitura extra da entrada para planejar; jobs com "version" própria prevalecem
+        versao = versao_do_lote(ler_jobs(args.entrada)) if args.versao == "lote" else int(args.versao)
+        print(f"versão QR fixa: {versao}")
+        jobs = (dict(job, version=job.get("version") or versao) for job in jobs)
+    if args.mascara is not None:
+        jobs = (job if job.get("mask_pattern") not in (None, "") else dict(job, mask_pattern=args.mascara)
+                for job in jobs)
+
+    disco = CacheDisco(args.cache_disco, args.cache_disco_mb * 1024 * 1024) if args.cache_disco else None
+    relatorio = gerar_lote(jobs, args.saida, workers=args.workers, chunksize=args.chunksize,
+                           logos=args.logo, compress_level=args.compress_level, deduplicar=args.deduplicar,
+                           cache_disco=disco)
+    if args.relatorio:
+        caminho = args.relatorio
+    elif args.saida.lower().endswith(".zip"):
+        caminho = os.path.splitext(args.saida)[0] + "_relatorio.json"
+    else:
+        caminho = os.path.join(args.saida, "relatorio.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    print(f"{relatorio['sucesso']}/{relatorio['total']} gerados em {relatorio['segundos']}s "
+          f"({relatorio['por_segundo']}/s)")
+    if "deduplicacao" in relatorio:
+        d = relatorio["deduplicacao"]
+        print(f"deduplicação: {d['renders']} renders, {d['repetidos']} repetidos ({d['razao']}x)")
+    if "cache_disco" in relatorio:
+        print(f"cache em disco: {relatorio['cache_disco']['acertos']} acertos")
+    for falha in relatorio["falhas"]:
+        print(f"  [{falha['indice']}] {falha['arquivo']}: {falha['erro']}", file=sys.stderr)
+    return 1 if relatorio["falhas"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
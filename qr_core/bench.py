@@ -0,0 +1,279 @@
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import metadata
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import qrcode
+from PIL import Image
+
+from .export import bytes_imagem
+from .logo import LOGO_FATOR, carregar_logo
+from .raster import HAS_NUMPY
+from .render import EC_DICT, MODS, codificar, gerar_qrcode, renderizar
+
+# Benchmark sem display: mede cada etapa de gerar_qrcode separadamente
+# (codificação, desenho, resize, logo, exportação PNG) e o total, e grava
+# JSON para comparar execuções (ex.: antes/depois de atualizar qrcode/Pillow).
+
+VERSOES = (1, 10, 20, 30, 40)
+TAMANHOS = (128, 256, 512, 1024)
+ENGINES = ("styled", "numpy")
+
+def payload_para_versao(versao, ec):
+    # maior payload em modo byte que ainda cabe na versão pedida
+    bits = qrcode.util.BIT_LIMIT_TABLE[EC_DICT[ec]][versao]
+    tam = (bits - 4 - (8 if versao < 10 else 16)) // 8
+    base = "benchmark-qr-"
+    return (base * (tam // len(base) + 1))[:tam]
+
+def _logo_teste():
+    caminho = os.path.join(tempfile.gettempdir(), "qr_bench_logo.png")
+    Image.new("RGBA", (600, 600), (220, 30, 60, 200)).save(caminho)
+    return caminho
+
+def _medir(fn, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        resultado = fn()
+        tempos.append((time.perf_counter() - t) * 1000)
+    return resultado, tempos
+
+def _resumo(tempos):
+    return {
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "min_ms": round(min(tempos), 3),
+        "max_ms": round(max(tempos), 3),
+    }
+
+def medir_caso(versao, ec, estilo, tamanho, engine, logo, repeticoes=3, box_size=10, border=4):
+    data = payload_para_versao(versao, ec)
+    etapas = {}
+
+    cod, t = _medir(lambda: codificar(data, ec, usar_cache=False), repeticoes)
+    etapas["encode"] = t
+    natural = (len(cod.modules) + 2 * border) * box_size
+    img, t = _medir(lambda: renderizar(cod, size=natural, border=border, module_style=estilo,
+                                       box_size=box_size, render_mode="exato", engine=engine), repeticoes)
+    etapas["render"] = t
+    img, t = _medir(lambda: img.resize((tamanho, tamanho), Image.LANCZOS), repeticoes)
+    etapas["resize"] = t
+    if logo:
+        lw = int(tamanho * LOGO_FATOR)
+        carregar_logo(logo, lw)
+
+        def compor():
+            base = img.copy()
+            lg = carregar_logo(logo, lw)
+            base.alpha_composite(lg, ((tamanho - lw) // 2, (tamanho - lw) // 2))
+            return base
+        img, t = _medir(compor, repeticoes)
+        etapas["logo"] = t
+    png, t = _medir(lambda: bytes_imagem(img, "png"), repeticoes)
+    etapas["export"] = t
+
+    opcoes = dict(size=tamanho, module_style=estilo, logo_path=logo, error_correction=ec,
+                  box_size=box_size, border=border, engine=engine)
+
+    def total():
+        cod_ = codificar(data, ec, usar_cache=False)
+        return bytes_imagem(renderizar(cod_, **{k: v for k, v in opcoes.items() if k != "error_correction"}), "png")
+    _, t = _medir(total, repeticoes)
+    etapas["total"] = t
+
+    # pico de memória num passe separado (tracemalloc distorce os tempos);
+    # cobre alocações Python e NumPy, não os buffers internos do Pillow
+    gc.collect()
+    tracemalloc.start()
+    gerar_qrcode(data, **opcoes)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    mediana_total = statistics.median(etapas["total"])
+    return {
+        "caso": {"versao": cod.version, "ec": ec, "estilo": estilo, "tamanho": tamanho,
+                 "engine": engine, "logo": bool(logo), "bytes_payload": len(data)},
+        "modulos": len(cod.modules),
+        "bytes_png": len(png),
+        "etapas": {k: _resumo(v) for k, v in etapas.items()},
+        "imagens_por_s": round(1000 / mediana_total, 2) if mediana_total else None,
+        "pico_python_kb": pico // 1024,
+    }
+
+def _chave(caso):
+    c = caso["caso"]
+    return (c["versao"], c["ec"], c["estilo"], c["tamanho"], c["engine"], c["logo"])
+
+def rodar(versoes=VERSOES, ecs=tuple(EC_DICT), estilos=tuple(MODS), tamanhos=TAMANHOS,
+          engines=ENGINES, logos=(False, True), repeticoes=3, progresso=None):
+    if not HAS_NUMPY:
+        engines = tuple(e for e in engines if e != "numpy")
+    caminho_logo = _logo_teste() if True in logos else None
+    resultados = []
+    for versao, ec, estilo, tamanho, engine, logo in itertools.product(
+            versoes, ecs, estilos, tamanhos, engines, logos):
+        r = medir_caso(versao, ec, estilo, tamanho, engine, caminho_logo if logo else None, repeticoes)
+        resultados.append(r)
+        if progresso:
+            progresso(r)
+
+    def versao_de(pacote):
+        try:
+            return metadata.version(pacote)
+        except metadata.PackageNotFoundError:
+            return None
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "qrcode": versao_de("qrcode"),
+            "pillow": versao_de("pillow"),
+            "numpy": versao_de("numpy"),
+            "repeticoes": repeticoes,
+            "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+            "quando": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "resultados": resultados,
+    }
+
+def comparar(base, atual, limite=0.10, minimo_ms=0.5):
+    # regressão: mediana de uma etapa piorou mais que `limite` (fração) e mais
+    # que `minimo_ms` em termos absolutos (evita ruído em etapas de microssegundos)
+    anteriores = {_chave(r): r for r in base["resultados"]}
+    regressoes = []
+    for r in atual["resultados"]:
+        antes = anteriores.get(_chave(r))
+        if antes is None:
+            continue
+        for etapa, medida in r["etapas"].items():
+            if etapa not in antes["etapas"]:
+                continue
+            a, d = antes["etapas"][etapa]["mediana_ms"], medida["mediana_ms"]
+            if d - a > minimo_ms and a and (d - a) / a > limite:
+                regressoes.append({"caso": r["caso"], "etapa": etapa, "antes_ms": a, "depois_ms": d,
+                                   "variacao": round((d - a) / a, 3)})
+    return regressoes
+
+# Orçamento de import a frio (ms, só o import, sem subir o interpretador) e
+# módulos que não podem ser carregados junto. Workers de vida curta pagam
+# esse custo a cada processo.
+ORCAMENTO_IMPORT = {
+    "qr_core": (15, ("tkinter", "customtkinter", "PIL", "qrcode", "numpy")),
+    "qr_core.payloads": (25, ("tkinter", "customtkinter", "PIL", "qrcode", "numpy")),
+    "qr_core.svg": (15, ("tkinter", "customtkinter", "PIL", "qrcode", "numpy")),
+    "qr_core.render": (150, ("tkinter", "customtkinter", "numpy", "qrcode.image.styledpil")),
+}
+
+# a sonda importa este qr_core, qualquer que seja o diretório de quem mede
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SONDA = """
+import sys, time, json
+t = time.perf_counter()
+import {modulo}
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({{"ms": ms, "modulos": sorted(sys.modules)}}))
+"""
+
+def medir_importacao(modulo, repeticoes=5):
+    # cada medição num interpretador novo; fica o menor tempo (menos ruído de disco/cache)
+    tempos = []
+    carregados = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", _SONDA.format(modulo=modulo)], cwd=_RAIZ,
+                               capture_output=True, text=True, check=True).stdout
+        r = json.loads(saida)
+        tempos.append(r["ms"])
+        carregados = r["modulos"]
+    return min(tempos), carregados
+
+def verificar_importacao(orcamento=ORCAMENTO_IMPORT, repeticoes=5):
+    resultados = []
+    for modulo, (limite_ms, proibidos) in orcamento.items():
+        ms, carregados = medir_importacao(modulo, repeticoes)
+        indevidos = sorted(p for p in proibidos if p in carregados)
+        resultados.append({
+            "modulo": modulo, "ms": round(ms, 2), "limite_ms": limite_ms,
+            "indevidos": indevidos, "ok": ms <= limite_ms and not indevidos,
+        })
+    return resultados
+
+def _lista(tipo):
+    return lambda s: tuple(tipo(x) for x in s.split(","))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas de gerar_qrcode")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("rodar", help="executa o benchmark e grava JSON")
+    p.add_argument("-o", "--saida", default="-", help="arquivo JSON (padrão: stdout)")
+    p.add_argument("--versoes", type=_lista(int), default=VERSOES)
+    p.add_argument("--ec", type=_lista(str), default=tuple(EC_DICT))
+    p.add_argument("--estilos", type=_lista(str), default=tuple(MODS))
+    p.add_argument("--tamanhos", type=_lista(int), default=TAMANHOS)
+    p.add_argument("--engines", type=_lista(str), default=ENGINES)
+    p.add_argument("--sem-logo", action="store_true", help="não mede os casos com logo")
+    p.add_argument("-r", "--repeticoes", type=int, default=3)
+    p.add_argument("--rapido", action="store_true", help="subconjunto pequeno (versões 1,20,40; EC M,H; 256,1024)")
+
+    c = sub.add_parser("comparar", help="compara dois JSONs e aponta regressões")
+    c.add_argument("base")
+    c.add_argument("atual")
+    c.add_argument("--limite", type=float, default=0.10, help="piora relativa tolerada (padrão 0.10)")
+    c.add_argument("--minimo-ms", type=float, default=0.5, help="piora absoluta mínima para contar")
+
+    i = sub.add_parser("importacao", help="mede o import a frio contra o orçamento")
+    i.add_argument("-r", "--repeticoes", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    if args.comando == "importacao":
+        resultados = verificar_importacao(repeticoes=args.repeticoes)
+        json.dump(resultados, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0 if all(r["ok"] for r in resultados) else 1
+    if args.comando == "comparar":
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.atual, encoding="utf-8") as f:
+            atual = json.load(f)
+        regressoes = comparar(base, atual, args.limite, args.minimo_ms)
+        json.dump({"regressoes": regressoes}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 1 if regressoes else 0
+
+    if args.rapido:
+        args.versoes, args.ec, args.tamanhos = (1, 20, 40), ("M", "H"), (256, 1024)
+
+    def progresso(r):
+        c = r["caso"]
+        print(f"v{c['versao']:>2} {c['ec']} {c['estilo']:<11} {c['tamanho']:>4}px {c['engine']:<6} "
+              f"logo={int(c['logo'])}  {r['etapas']['total']['mediana_ms']:>9.2f} ms  "
+              f"{r['imagens_por_s']:>8} img/s", file=sys.stderr)
+
+    relatorio = rodar(args.versoes, args.ec, args.estilos, args.tamanhos, args.engines,
+                      (False,) if args.sem_logo else (False, True), args.repeticoes, progresso)
+    if args.saida == "-":
+        json.dump(relatorio, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    # LRU limitado por número de entradas e por bytes estimados (informados
+    # pelo chamador em put). Seguro para uso entre threads.
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._dados = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._dados.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._dados.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, nbytes=0):
+        with self._lock:
+            antigo = self._dados.pop(key, None)
+            if antigo is not None:
+                self._bytes -= antigo[1]
+            if nbytes > self.max_bytes:
+                return
+            self._dados[key] = (value, nbytes)
+            self._bytes += nbytes
+            while len(self._dados) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, n) = self._dados.popitem(last=False)
+                self._bytes -= n
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._dados)
+
+    def __contains__(self, key):
+        return key in self._dados
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._dados),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+class CacheDisco:
+    # Cache persistente endereçado por conteúdo: um arquivo por chave
+    # (<dir>/ab/cdef...), com os bytes finais exatamente como vão para o
+    # cliente ou para o disco, sem cabeçalho. Um acerto é a leitura de um
+    # arquivo (ou uma cópia no kernel via copiar/sendfile).
+    #
+    # Gravação atômica (arquivo temporário + os.replace): processos e threads
+    # concorrentes podem gravar a mesma chave; quem lê vê o arquivo inteiro de
+    # um deles, nunca um pedaço. Despejo LRU pelo mtime, renovado nos
+    # acertos, quando o total passa de max_bytes. O objeto é serializável
+    # (vai para os workers do lote); cada processo estima o total por conta
+    # própria e reconta o diretório antes de despejar.
+
+    TOQUE = 60  # segundos: acertos seguidos não renovam o mtime a cada leitura
+
+    def __init__(self, diretorio, max_bytes=512 * 1024 * 1024):
+        self.diretorio = os.path.abspath(diretorio)
+        self.max_bytes = max_bytes
+        self._bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.gravacoes = 0
+        self.evictions = 0
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def caminho(self, chave):
+        chave = chave.hex() if isinstance(chave, bytes) else str(chave)
+        return os.path.join(self.diretorio, chave[:2], chave[2:])
+
+    def abrir(self, chave):
+        # arquivo aberto (binário) ou None; pronto para socket.sendfile/mmap
+        try:
+            f = open(self.caminho(chave), "rb")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tocar(f.name, os.fstat(f.fileno()).st_mtime)
+        return f
+
+    def _tocar(self, caminho, mtime):
+        # renova a posição no LRU
+        if time.time() - mtime > self.TOQUE:
+            try:
+                os.utime(caminho)
+            except OSError:
+                pass  # despejado por outro processo nesse meio-tempo
+
+    def get(self, chave, default=None):
+        f = self.abrir(chave)
+        if f is None:
+            return default
+        with f:
+            return f.read()
+
+    def copiar(self, chave, destino):
+        # acerto direto para um arquivo de saída: shutil.copyfile copia no
+        # kernel (sendfile no Linux), sem passar os bytes pelo Python
+        origem = self.caminho(chave)
+        try:
+            shutil.copyfile(origem, destino)
+        except FileNotFoundError as e:
+            if e.filename != origem:
+                raise
+            self.misses += 1
+            return False
+        self.hits += 1
+        try:
+            self._tocar(origem, os.stat(origem).st_mtime)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def put(self, chave, dados):
+        destino = self.caminho(chave)
+        pasta = os.path.dirname(destino)
+        os.makedirs(pasta, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=pasta, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(dados)
+            # a mesma chave regravada (escritores concorrentes) não soma duas vezes
+            try:
+                anterior = os.stat(destino).st_size
+            except FileNotFoundError:
+                anterior = 0
+            os.replace(temp, destino)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+        self.gravacoes += 1
+        if self._bytes is None:
+            self._bytes = self._total()
+        else:
+            self._bytes += len(dados) - anterior
+        if self._bytes > self.max_bytes:
+            self.despejar()
+
+    def _entradas(self):
+        # (mtime, tamanho, caminho) de cada arquivo; temporários órfãos com
+        # mais de uma hora (gravação interrompida) também entram no despejo
+        limite_temp = time.time() - 3600
+        for pasta in os.scandir(self.diretorio):
+            if not pasta.is_dir():
+                continue
+            try:
+                itens = list(os.scandir(pasta.path))
+            except FileNotFoundError:
+                continue
+            for item in itens:
+                try:
+                    st = item.stat()
+                except FileNotFoundError:
+                    continue
+                if item.name.startswith(".tmp-"):
+                    if st.st_mtime >= limite_temp:
+                        continue
+                    yield 0, st.st_size, item.path
+                else:
+                    yield st.st_mtime, st.st_size, item.path
+
+    def _total(self):
+        return sum(tamanho for _, tamanho, _ in self._entradas())
+
+    def despejar(self, alvo=None):
+        # remove os menos usados até `alvo` (padrão: 90% do limite)
+        alvo = self.max_bytes * 0.9 if alvo is None else alvo
+        entradas = sorted(self._entradas())
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in entradas:
+            if total <= alvo:
+                break
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass  # outro processo despejou antes
+            else:
+                self.evictions += 1
+            total -= tamanho
+        self._bytes = total
+
+    def clear(self):
+        self.despejar(0)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "gravacoes": self.gravacoes,
+            "evictions": self.evictions,
+            "bytes": self._bytes if self._bytes is not None else self._total(),
+            "max_bytes": self.max_bytes,
+            "diretorio": self.diretorio,
+        }
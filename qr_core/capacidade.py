@@ -0,0 +1,140 @@
+from bisect import bisect_left
+from collections import namedtuple
+
+from qrcode import constants
+from qrcode.util import (
+    ALPHA_NUM,
+    BIT_LIMIT_TABLE,
+    MODE_8BIT_BYTE,
+    MODE_ALPHA_NUM,
+    MODE_NUMBER,
+    QRData,
+    mode_sizes_for_version,
+    to_bytestring,
+)
+
+# Planejador de capacidade: segmentação ótima do payload em modos numérico,
+# alfanumérico e byte, e a menor versão em que ele cabe, calculadas direto
+# das tabelas de capacidade (sem montar o QR por tentativa).
+#
+# qr.add_data(data) só troca de modo em trechos de 20+ caracteres; telefones,
+# valores e campos em maiúsculas do PIX ficam inteiros em modo byte. Aqui a
+# segmentação é por programação dinâmica sobre o custo exato em bits.
+
+EC_DICT = {
+    'L': constants.ERROR_CORRECT_L,
+    'M': constants.ERROR_CORRECT_M,
+    'Q': constants.ERROR_CORRECT_Q,
+    'H': constants.ERROR_CORRECT_H,
+}
+
+MODOS = (MODE_NUMBER, MODE_ALPHA_NUM, MODE_8BIT_BYTE)
+NOMES_MODO = {MODE_NUMBER: "numerico", MODE_ALPHA_NUM: "alfanumerico", MODE_8BIT_BYTE: "byte"}
+
+# o tamanho do campo de contagem muda em 10 e 27: uma segmentação por faixa
+FAIXAS = ((1, 9), (10, 26), (27, 40))
+
+_DIGITOS = frozenset(b"0123456789")
+_ALFANUM = frozenset(ALPHA_NUM)
+
+Plano = namedtuple("Plano", ["version", "error_correction", "segmentos", "bits", "capacidade_bits", "modulos"])
+
+def _bits_dados(modo, n):
+    if modo == MODE_NUMBER:
+        return 10 * (n // 3) + (0, 4, 7)[n % 3]
+    if modo == MODE_ALPHA_NUM:
+        return 11 * (n // 2) + 6 * (n % 2)
+    return 8 * n
+
+def bits_segmentos(segmentos, version):
+    larguras = mode_sizes_for_version(version)
+    return sum(4 + larguras[modo] + _bits_dados(modo, len(trecho)) for modo, trecho in segmentos)
+
+def segmentar(dados, version=1):
+    # devolve [(modo, bytes)] de custo mínimo para a faixa de versões de `version`.
+    # Custos em sextos de bit: numérico 10/3 bits por dígito, alfanumérico 11/2.
+    dados = to_bytestring(dados)
+    if not dados:
+        return []
+    larguras = mode_sizes_for_version(version)
+    cabecalho = {m: (4 + larguras[m]) * 6 for m in MODOS}
+    por_char = {MODE_NUMBER: 20, MODE_ALPHA_NUM: 33, MODE_8BIT_BYTE: 48}
+
+    custos = dict(cabecalho)
+    origem = []
+    for b in dados:
+        atual, de = {}, {}
+        for m in MODOS:
+            if m == MODE_NUMBER and b not in _DIGITOS:
+                continue
+            if m == MODE_ALPHA_NUM and b not in _ALFANUM:
+                continue
+            if m in custos:
+                atual[m] = custos[m] + por_char[m]
+                de[m] = m
+            # ou trocar de modo antes deste caractere: fecha o segmento
+            # anterior (arredonda para bits inteiros) e paga o cabeçalho do novo
+            for k, custo in custos.items():
+                if k == m:
+                    continue
+                trocado = -(-custo // 6) * 6 + cabecalho[m] + por_char[m]
+                if m not in atual or trocado < atual[m]:
+                    atual[m] = trocado
+                    de[m] = k
+        origem.append(de)
+        custos = atual
+
+    modo = min(custos, key=custos.get)
+    modos = []
+    for de in reversed(origem):
+        modos.append(modo)
+        modo = de[modo]
+    modos.reverse()
+
+    segmentos = []
+    ini = 0
+    for i in range(1, len(dados) + 1):
+        if i == len(dados) or modos[i] != modos[ini]:
+            segmentos.append((modos[ini], dados[ini:i]))
+            ini = i
+    return segmentos
+
+def planejar(data, error_correction="H", version=None):
+    # version: fixa a versão (erro se o payload não couber); None = a menor possível
+    ec = EC_DICT.get(error_correction, EC_DICT["H"])
+    limites = BIT_LIMIT_TABLE[ec]
+    if version is not None:
+        if not 1 <= version <= 40:
+            raise ValueError(f"Versão QR inválida: {version}")
+        segmentos = segmentar(data, version)
+        bits = bits_segmentos(segmentos, version)
+        if bits > limites[version]:
+            raise ValueError(f"Payload não cabe na versão {version} (EC {error_correction}): "
+                             f"{bits} bits para {limites[version]}")
+        return Plano(version, ec, tuple(segmentos), bits, limites[version], version * 4 + 17)
+
+    for inicio, fim in FAIXAS:
+        segmentos = segmentar(data, inicio)
+        bits = bits_segmentos(segmentos, inicio)
+        v = bisect_left(limites, bits, inicio, fim + 1)
+        if v <= fim:
+            return Plano(v, ec, tuple(segmentos), bits, limites[v], v * 4 + 17)
+    raise ValueError(f"Payload grande demais para um QR Code (EC {error_correction})")
+
+def dados_qr(plano):
+    # segmentos prontos para QRCode.add_data (sem reanalisar o texto)
+    return [QRData(trecho, mode=modo, check_data=False) for modo, trecho in plano.segmentos]
+
+def versao_comum(itens):
+    # itens: iterável de (data, error_correction). Menor versão que serve a
+    # todos, para fixar uma só versão (mesmo tamanho de matriz) num lote inteiro
+    return max((planejar(data, ec).version for data, ec in itens), default=1)
+
+def descrever(plano):
+    return {
+        "versao": plano.version,
+        "modulos": plano.modulos,
+        "bits": plano.bits,
+        "capacidade_bits": plano.capacidade_bits,
+        "segmentos": [{"modo": NOMES_MODO[m], "tamanho": len(t)} for m, t in plano.segmentos],
+    }
@@ -0,0 +1,367 @@
+import io
+import os
+import struct
+import zipfile
+import zlib
+
+from PIL import Image, ImageChops
+
+from .svg import gerar_svg  # reexportado por compatibilidade
+
+FORMATOS = ("png", "jpg", "svg", "pdf")
+
+# parâmetros de gerar_qrcode que valem para o SVG (vetorial, sem raster)
+SVG_OPCOES = ("fg_color", "bg_color", "border", "module_style", "size")
+
+def formato_de(caminho, padrao="png"):
+    ext = os.path.splitext(str(caminho))[1].lower().lstrip(".")
+    if ext == "jpeg":
+        return "jpg"
+    return ext if ext in FORMATOS else padrao
+
+def compactar(img):
+    # Reduz para o menor modo sem perda: RGBA opaco vira RGB, duas cores viram
+    # paleta de 2 entradas (PNG de 1 bit por pixel) e tons de cinza viram L.
+    if img.mode in ("1", "L", "P"):
+        return img
+    if img.mode == "RGBA":
+        if img.getextrema()[3][0] < 255:
+            return img
+        img = img.convert("RGB")
+    if img.mode != "RGB":
+        return img
+    cores = img.getcolors(2)
+    if cores is not None:
+        pal = Image.new("P", (1, 1))
+        pal.putpalette([c for _, rgb in cores for c in rgb])
+        return img.quantize(palette=pal, dither=Image.Dither.NONE)
+    r, g, b = img.split()
+    if ImageChops.difference(r, g).getbbox() is None and ImageChops.difference(g, b).getbbox() is None:
+        return r
+    return img
+
+def salvar_imagem(img, destino, formato=None, compress_level=6, quality=92):
+    # destino: caminho ou arquivo binário aberto
+    formato = formato or formato_de(destino)
+    if formato == "png":
+        compactar(img).save(destino, "PNG", compress_level=compress_level)
+    elif formato == "jpg":
+        img.convert("RGB").save(destino, "JPEG", quality=quality)
+    elif formato == "pdf":
+        salvar_pdf([img], destino)
+    else:
+        raise ValueError(f"Formato de imagem não suportado: {formato}")
+
+def bytes_imagem(img, formato="png", **opcoes):
+    buf = io.BytesIO()
+    salvar_imagem(img, buf, formato, **opcoes)
+    return buf.getvalue()
+
+def bits_paleta(faixa):
+    # "P" de 2 cores -> "1" com bit = índice da paleta (0/1), para gravar 1 bit por pixel
+    return Image.frombytes("L", faixa.size, faixa.tobytes()).point(lambda v: 255 if v else 0).convert("1")
+
+class EscritorPdf:
+    # PDF mínimo escrito em fluxo: cada página é uma imagem comprimida com
+    # Flate. Só os offsets dos objetos ficam em memória, então o número de
+    # páginas não pesa. Páginas grandes podem ser enviadas em faixas.
+
+    def __init__(self, destino):
+        self._proprio = isinstance(destino, (str, os.PathLike))
+        self._f = open(destino, "wb") if self._proprio else destino
+        self._inicio = self._f.tell() if not self._proprio else 0
+        self._offsets = {}
+        self._paginas = []
+        self._proximo = 3  # 1 = catálogo, 2 = árvore de páginas (escritos no fim)
+        self._pagina = None
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def _novo(self):
+        num = self._proximo
+        self._proximo += 1
+        return num
+
+    def _abrir(self, num):
+        self._offsets[num] = self._f.tell() - self._inicio
+        self._f.write(f"{num} 0 obj\n".encode())
+
+    def _objeto(self, num, corpo):
+        self._abrir(num)
+        self._f.write(corpo.encode() if isinstance(corpo, str) else corpo)
+        self._f.write(b"\nendobj\n")
+
+    def iniciar_pagina(self, largura, altura, modo, dpi=300, paleta=None):
+        # modo: "1", "L", "RGB" ou "P" (paleta: lista plana RGB, até 256 cores)
+        if modo == "1":
+            espaco, bpc = "/DeviceGray", 1
+        elif modo == "L":
+            espaco, bpc = "/DeviceGray", 8
+        elif modo == "RGB":
+            espaco, bpc = "/DeviceRGB", 8
+        elif modo == "P":
+            cores = len(paleta) // 3
+            espaco = f"[/Indexed /DeviceRGB {cores - 1} <{bytes(paleta).hex()}>]"
+            bpc = 1 if cores <= 2 else 8
+        else:
+            raise ValueError(f"Modo não suportado no PDF: {modo}")
+
+        img_num, tam_num = self._novo(), self._novo()
+        self._abrir(img_num)
+        self._f.write(
+            f"<< /Type /XObject /Subtype /Image /Width {largura} /Height {altura} "
+            f"/ColorSpace {espaco} /BitsPerComponent {bpc} /Filter /FlateDecode "
+            f"/Length {tam_num} 0 R >>\nstream\n".encode()
+        )
+        self._pagina = {
+            "img": img_num, "tam": tam_num, "modo": modo, "bpc": bpc,
+            "largura": largura, "altura": altura, "dpi": dpi,
+            "z": zlib.compressobj(6), "bytes": 0,
+        }
+
+    def escrever_faixa(self, faixa):
+        p = self._pagina
+        if p["modo"] == "P" and p["bpc"] == 1:
+            # índices 0/1 empacotados em 1 bit por pixel
+            faixa = bits_paleta(faixa)
+        elif faixa.mode != p["modo"]:
+            faixa = faixa.convert(p["modo"])
+        dados = p["z"].compress(faixa.tobytes())
+        self._f.write(dados)
+        p["bytes"] += len(dados)
+
+    def terminar_pagina(self):
+        p = self._pagina
+        resto = p["z"].flush()
+        self._f.write(resto)
+        p["bytes"] += len(resto)
+        self._f.write(b"\nendstream\nendobj\n")
+        self._objeto(p["tam"], str(p["bytes"]))
+
+        w_pt = p["largura"] * 72 / p["dpi"]
+        h_pt = p["altura"] * 72 / p["dpi"]
+        conteudo = f"q {w_pt:.2f} 0 0 {h_pt:.2f} 0 0 cm /Im0 Do Q".encode()
+        cont_num, pag_num = self._novo(), self._novo()
+        self._objeto(cont_num, b"<< /Length %d >>\nstream\n" % len(conteudo) + conteudo + b"\nendstream")
+        self._objeto(
+            pag_num,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {w_pt:.2f} {h_pt:.2f}] "
+            f"/Resources << /XObject << /Im0 {p['img']} 0 R >> >> /Contents {cont_num} 0 R >>",
+        )
+        self._paginas.append(pag_num)
+        self._pagina = None
+
+    def adicionar_imagem(self, img, dpi=300):
+        img = compactar(img)
+        if img.mode not in ("1", "L", "RGB", "P"):
+            img = img.convert("RGB")
+        paleta = img.getpalette() if img.mode == "P" else None
+        self.iniciar_pagina(img.size[0], img.size[1], img.mode, dpi, paleta)
+        self.escrever_faixa(img)
+        self.terminar_pagina()
+
+    def fechar(self):
+        if self._f is None:
+            return
+        kids = " ".join(f"{n} 0 R" for n in self._paginas)
+        self._objeto(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._paginas)} >>")
+        self._objeto(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self._f.tell() - self._inicio
+        total = self._proximo
+        linhas = [f"xref\n0 {total}\n", "0000000000 65535 f \n"]
+        for num in range(1, total):
+            linhas.append(f"{self._offsets.get(num, 0):010d} 00000 n \n")
+        linhas.append(f"trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+        self._f.write("".join(linhas).encode())
+        if self._proprio:
+            self._f.close()
+        self._f = None
+
+def salvar_pdf(imagens, destino, dpi=300):
+    # uma página por imagem; aceita qualquer iterável (gerador não é materializado)
+    with EscritorPdf(destino) as pdf:
+        for img in imagens:
+            pdf.adicionar_imagem(img, dpi)
+
+def _chunk_png(tipo, dados):
+    return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados))
+
+class EscritorPng:
+    # PNG de 1 bit escrito em faixas: "1" (cinza) ou "P" com paleta de 2
+    # cores. Só a faixa atual fica em memória, qualquer que seja a altura.
+
+    def __init__(self, destino, largura, altura, modo="1", paleta=None, dpi=None, compress_level=6):
+        self._proprio = isinstance(destino, (str, os.PathLike))
+        self._f = open(destino, "wb") if self._proprio else destino
+        self._modo = modo
+        self._z = zlib.compressobj(compress_level)
+        self._f.write(b"\x89PNG\r\n\x1a\n")
+        self._f.write(_chunk_png(b"IHDR", struct.pack(">IIBBBBB", largura, altura, 1, 3 if modo == "P" else 0, 0, 0, 0)))
+        if dpi:
+            ppm = round(dpi / 0.0254)
+            self._f.write(_chunk_png(b"pHYs", struct.pack(">IIB", ppm, ppm, 1)))
+        if modo == "P":
+            self._f.write(_chunk_png(b"PLTE", bytes(paleta[:6])))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def escrever_faixa(self, faixa):
+        faixa = bits_paleta(faixa) if self._modo == "P" else faixa.convert("1")
+        passo = (faixa.size[0] + 7) // 8
+        dados = faixa.tobytes()
+        # filtro 0 (None) em cada linha: dados de 1 bit comprimem bem sem filtro
+        linhas = b"".join(b"\0" + dados[i:i + passo] for i in range(0, len(dados), passo))
+        comp = self._z.compress(linhas)
+        if comp:
+            self._f.write(_chunk_png(b"IDAT", comp))
+
+    def fechar(self):
+        if self._f is None:
+            return
+        self._f.write(_chunk_png(b"IDAT", self._z.flush()))
+        self._f.write(_chunk_png(b"IEND", b""))
+        if self._proprio:
+            self._f.close()
+        self._f = None
+
+class EscritorTiff:
+    # TIFF multipágina de 1 bit ("1" ou "P" de 2 cores), tiras Deflate de
+    # altura fixa gravadas conforme chegam. O IFD de cada página vai no fim
+    # dela; o ponteiro da página anterior é corrigido com seek (destino
+    # precisa ser um arquivo com seek).
+
+    LINHAS_POR_TIRA = 64
+
+    def __init__(self, destino):
+        self._proprio = isinstance(destino, (str, os.PathLike))
+        self._f = open(destino, "wb") if self._proprio else destino
+        self._inicio = self._f.tell()
+        self._f.write(b"II*\0\0\0\0\0")
+        self._ponteiro = self._inicio + 4  # onde gravar o offset do próximo IFD
+        self._pagina = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def iniciar_pagina(self, largura, altura, modo="1", dpi=300, paleta=None):
+        if modo not in ("1", "P"):
+            raise ValueError(f"Modo não suportado no TIFF: {modo}")
+        self._pagina = {
+            "largura": largura, "altura": altura, "modo": modo, "dpi": dpi, "paleta": paleta,
+            "passo": (largura + 7) // 8, "pendente": b"", "offsets": [], "tamanhos": [],
+        }
+
+    def _tira(self, dados):
+        p = self._pagina
+        comp = zlib.compress(dados, 6)
+        p["offsets"].append(self._f.tell() - self._inicio)
+        p["tamanhos"].append(len(comp))
+        self._f.write(comp)
+
+    def escrever_faixa(self, faixa):
+        p = self._pagina
+        faixa = bits_paleta(faixa) if p["modo"] == "P" else faixa.convert("1")
+        dados = p["pendente"] + faixa.tobytes()
+        tam = self.LINHAS_POR_TIRA * p["passo"]
+        ini = 0
+        while len(dados) - ini >= tam:
+            self._tira(dados[ini:ini + tam])
+            ini += tam
+        p["pendente"] = dados[ini:]
+
+    def terminar_pagina(self):
+        p = self._pagina
+        if p["pendente"]:
+            self._tira(p["pendente"])
+        if self._f.tell() % 2:
+            self._f.write(b"\0")
+
+        # valores que não cabem em 4 bytes vão antes do IFD
+        extras = {}
+
+        def fora(chave, dados):
+            extras[chave] = self._f.tell() - self._inicio
+            self._f.write(dados)
+
+        n = len(p["offsets"])
+        fora("offsets", struct.pack(f"<{n}I", *p["offsets"]))
+        fora("tamanhos", struct.pack(f"<{n}I", *p["tamanhos"]))
+        fora("res", struct.pack("<II", int(p["dpi"]), 1))
+        campos = [
+            (256, 4, 1, p["largura"]),
+            (257, 4, 1, p["altura"]),
+            (258, 3, 1, 1),
+            (259, 3, 1, 8),  # Deflate (Adobe)
+            (262, 3, 1, 3 if p["modo"] == "P" else 1),  # paleta / BlackIsZero
+            (273, 4, n, extras["offsets"] if n > 1 else p["offsets"][0]),
+            (277, 3, 1, 1),
+            (278, 4, 1, self.LINHAS_POR_TIRA),
+            (279, 4, n, extras["tamanhos"] if n > 1 else p["tamanhos"][0]),
+            (282, 5, 1, extras["res"]),
+            (283, 5, 1, extras["res"]),
+            (296, 3, 1, 2),  # polegada
+        ]
+        if p["modo"] == "P":
+            # ColorMap: todos os R, depois G, depois B, em 16 bits
+            pal = p["paleta"][:6]
+            fora("cores", struct.pack("<6H", *(pal[i + c] * 257 for c in range(3) for i in (0, 3))))
+            campos.append((320, 3, 6, extras["cores"]))
+
+        ifd = self._f.tell() - self._inicio
+        self._f.write(struct.pack("<H", len(campos)))
+        for tag, tipo, qtd, valor in campos:
+            if tipo == 3 and qtd == 1:
+                self._f.write(struct.pack("<HHIHH", tag, tipo, qtd, valor, 0))
+            else:
+                self._f.write(struct.pack("<HHII", tag, tipo, qtd, valor))
+        proximo = self._f.tell()
+        self._f.write(b"\0\0\0\0")
+        fim = self._f.tell()
+        self._f.seek(self._ponteiro)
+        self._f.write(struct.pack("<I", ifd))
+        self._f.seek(fim)
+        self._ponteiro = proximo
+        self._pagina = None
+
+    def fechar(self):
+        if self._f is None:
+            return
+        if self._proprio:
+            self._f.close()
+        self._f = None
+
+class EscritorZip:
+    # Grava cada arquivo no ZIP assim que fica pronto; nada acumula em memória.
+    # PNG/PDF já vêm comprimidos e entram sem recompressão.
+
+    def __init__(self, destino):
+        self._zip = zipfile.ZipFile(destino, "w")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def adicionar(self, nome, dados):
+        comp = zipfile.ZIP_DEFLATED if formato_de(nome, None) in ("svg", None) else zipfile.ZIP_STORED
+        self._zip.writestr(nome, dados, compress_type=comp)
+
+    def replicar(self, nome, origem):
+        # cópia de uma entrada já gravada (jobs deduplicados do lote)
+        self.adicionar(nome, self._zip.read(origem))
+
+    def fechar(self):
+        self._zip.close()
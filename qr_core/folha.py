@@ -0,0 +1,245 @@
+import argparse
+import itertools
+import os
+import sys
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from . import raster
+from .export import EscritorPdf, EscritorPng, EscritorTiff
+from .raster import HAS_NUMPY, pixels_matriz
+from .render import codificar
+
+# Folhas de etiquetas para impressão: grade de QR Codes com legenda e marcas
+# de corte, rasterizada em faixas (uma linha de etiquetas por vez) num
+# canvas de 1 bit e gravada em fluxo em PDF, TIFF ou PNG. A memória depende
+# da altura de uma linha de etiquetas, não do tamanho da página nem do
+# número de códigos.
+
+PAPEIS = {
+    "A5": (148, 210),
+    "A4": (210, 297),
+    "A3": (297, 420),
+    "carta": (216, 279),
+}
+
+FORMATOS_FOLHA = ("pdf", "tiff", "png")
+
+# as faixas são matrizes booleanas do NumPy (opcional, como no motor "numpy")
+np = None
+
+def _carregar_numpy():
+    global np
+    if not HAS_NUMPY:
+        raise ImportError("Folhas de etiquetas requerem NumPy (pip install numpy)")
+    raster._carregar_numpy()
+    np = raster.np
+
+def _px(mm, dpi):
+    return round(mm * dpi / 25.4)
+
+class LayoutFolha:
+    def __init__(self, papel="A4", dpi=600, lado_mm=20, margem_mm=10, espaco_mm=4, legenda_mm=3,
+                 marcas=True, paisagem=False):
+        largura, altura = PAPEIS[papel] if isinstance(papel, str) else papel
+        if paisagem:
+            largura, altura = altura, largura
+        self.dpi = dpi
+        self.largura, self.altura = _px(largura, dpi), _px(altura, dpi)
+        self.margem = _px(margem_mm, dpi)
+        self.espaco = _px(espaco_mm, dpi)
+        self.lado = _px(lado_mm, dpi)
+        self.legenda = _px(legenda_mm, dpi) if legenda_mm else 0
+        self.cel_w, self.cel_h = self.lado, self.lado + self.legenda
+        util_w = self.largura - 2 * self.margem
+        util_h = self.altura - 2 * self.margem
+        self.colunas = (util_w + self.espaco) // (self.cel_w + self.espaco)
+        self.linhas = (util_h + self.espaco) // (self.cel_h + self.espaco)
+        if self.colunas < 1 or self.linhas < 1:
+            raise ValueError("Etiqueta não cabe na página com essas margens")
+        # grade centralizada na área útil
+        self.x0 = (self.largura - (self.colunas * (self.cel_w + self.espaco) - self.espaco)) // 2
+        self.y0 = (self.altura - (self.linhas * (self.cel_h + self.espaco) - self.espaco)) // 2
+        # marcas de corte: traços nos cantos de cada etiqueta, dentro do vão
+        self.marca = min(self.espaco // 2, self.margem, _px(3, dpi)) if marcas else 0
+        self.traco = max(1, _px(0.1, dpi))
+
+    @property
+    def por_pagina(self):
+        return self.colunas * self.linhas
+
+def _fonte(altura):
+    try:
+        return ImageFont.load_default(size=max(8, int(altura * 0.75)))
+    except TypeError:  # Pillow sem FreeType
+        return ImageFont.load_default()
+
+def _legenda(texto, layout, fonte):
+    # texto centralizado numa faixa cel_w x legenda, cortado com "…" se não couber
+    img = Image.new("L", (layout.cel_w, layout.legenda), 0)
+    if texto:
+        texto = str(texto)
+        if fonte.getlength(texto) > layout.cel_w:
+            while texto and fonte.getlength(texto + "…") > layout.cel_w:
+                texto = texto[:-1]
+            texto += "…"
+        desenho = ImageDraw.Draw(img)
+        x0, y0, x1, y1 = desenho.textbbox((0, 0), texto, font=fonte)
+        desenho.text(((layout.cel_w - (x1 - x0)) // 2 - x0, (layout.legenda - (y1 - y0)) // 2 - y0),
+                     texto, fill=255, font=fonte)
+    return np.asarray(img) > 127
+
+def _codigo(data, layout, error_correction, module_style, border):
+    # box inteiro (sem reamostragem), centralizado no quadrado da etiqueta
+    cod = codificar(data, error_correction)
+    total = len(cod.modules) + 2 * border
+    box = layout.lado // total
+    if box < 1:
+        raise ValueError(f"Etiqueta pequena demais para um QR de {total} módulos a {layout.dpi} dpi")
+    return pixels_matriz(cod.modules, box, module_style, border)
+
+def _faixas_pagina(itens, layout, fonte, error_correction, module_style, border):
+    # gera as faixas da página de cima para baixo: margens em branco e uma
+    # faixa por linha de etiquetas (com metade do vão acima e abaixo, onde
+    # ficam as marcas de corte)
+    w = layout.largura
+    meio = layout.espaco // 2
+    altura_faixa = layout.cel_h + layout.espaco
+    y = 0
+    for linha in range(layout.linhas):
+        topo_cel = layout.y0 + linha * altura_faixa
+        topo = max(y, topo_cel - meio)
+        while y < topo:
+            h = min(altura_faixa, topo - y)
+            yield np.zeros((h, w), dtype=bool)
+            y += h
+        fim = min(layout.altura, topo_cel + layout.cel_h + layout.espaco - meio)
+        faixa = np.zeros((fim - topo, w), dtype=bool)
+        cy = topo_cel - topo  # topo da etiqueta dentro da faixa
+        for col, (data, texto) in enumerate(itens[linha * layout.colunas:(linha + 1) * layout.colunas]):
+            cx = layout.x0 + col * (layout.cel_w + layout.espaco)
+            px = _codigo(data, layout, error_correction, module_style, border)
+            off = (layout.lado - px.shape[0]) // 2
+            faixa[cy + off:cy + off + px.shape[0], cx + off:cx + off + px.shape[1]] = px
+            if layout.legenda:
+                faixa[cy + layout.lado:cy + layout.cel_h, cx:cx + layout.cel_w] = _legenda(texto, layout, fonte)
+            if layout.marca:
+                _marcas(faixa, cx, cy, layout)
+        yield faixa
+        y = fim
+    while y < layout.altura:
+        h = min(altura_faixa, layout.altura - y)
+        yield np.zeros((h, w), dtype=bool)
+        y += h
+
+def _marcas(faixa, cx, cy, layout):
+    m, t = layout.marca, layout.traco
+    x1, y1 = cx + layout.cel_w, cy + layout.cel_h
+    for x in (cx, x1 - t):
+        faixa[max(0, cy - m):cy, x:x + t] = True  # verticais, acima e abaixo
+        faixa[y1:y1 + m, x:x + t] = True
+    for y in (cy, y1 - t):
+        faixa[y:y + t, cx - m:cx] = True  # horizontais, à esquerda e à direita
+        faixa[y:y + t, x1:x1 + m] = True
+
+def _imagem_faixa(faixa, modo, paleta):
+    if modo == "1":
+        # "1" do Pillow: bit 1 = branco; módulos pretos
+        return Image.frombytes("1", (faixa.shape[1], faixa.shape[0]), np.packbits(~faixa, axis=1).tobytes())
+    img = Image.frombytes("P", (faixa.shape[1], faixa.shape[0]), faixa.view(np.uint8).tobytes())
+    img.putpalette(paleta)
+    return img
+
+def formato_folha(destino):
+    ext = os.path.splitext(str(destino))[1].lower().lstrip(".")
+    ext = {"tif": "tiff"}.get(ext, ext)
+    if ext not in FORMATOS_FOLHA:
+        raise ValueError(f"Formato de folha não suportado: {ext or '?'} (use .pdf, .tiff ou .png)")
+    return ext
+
+def compor_folhas(itens, destino, layout=None, error_correction="M", module_style="quadrado", border=2,
+                  fg_color="#FFFFFF", bg_color="#000000"):
+    # itens: iterável de payloads (str) ou de (payload, legenda); consumido
+    # uma página por vez. PDF/TIFF: um arquivo multipágina. PNG: um arquivo
+    # por página (<nome>-001.png, ...). Cores na convenção de gerar_qrcode:
+    # fg é o fundo, bg os módulos.
+    _carregar_numpy()
+    layout = layout or LayoutFolha()
+    formato = formato_folha(destino)
+    fundo, modulo = ImageColor.getrgb(fg_color)[:3], ImageColor.getrgb(bg_color)[:3]
+    modo = "1" if (fundo, modulo) == ((255, 255, 255), (0, 0, 0)) else "P"
+    paleta = list(fundo + modulo) if modo == "P" else None
+    fonte = _fonte(layout.legenda) if layout.legenda else None
+
+    itens = ((i, None) if isinstance(i, str) else (i[0], i[1]) for i in itens)
+    paginas = codigos = 0
+    escritor = None
+    if formato == "pdf":
+        escritor = EscritorPdf(destino)
+    elif formato == "tiff":
+        escritor = EscritorTiff(destino)
+    try:
+        while True:
+            pagina = list(itertools.islice(itens, layout.por_pagina))
+            if not pagina:
+                break
+            paginas += 1
+            codigos += len(pagina)
+            if formato == "png":
+                base, ext = os.path.splitext(str(destino))
+                pagina_png = EscritorPng(f"{base}-{paginas:03d}{ext}", layout.largura, layout.altura,
+                                         modo, paleta, layout.dpi)
+                with pagina_png:
+                    for faixa in _faixas_pagina(pagina, layout, fonte, error_correction, module_style, border):
+                        pagina_png.escrever_faixa(_imagem_faixa(faixa, modo, paleta))
+                continue
+            escritor.iniciar_pagina(layout.largura, layout.altura, modo, layout.dpi, paleta)
+            for faixa in _faixas_pagina(pagina, layout, fonte, error_correction, module_style, border):
+                escritor.escrever_faixa(_imagem_faixa(faixa, modo, paleta))
+            escritor.terminar_pagina()
+    finally:
+        if escritor is not None:
+            escritor.fechar()
+
+    return {
+        "paginas": paginas,
+        "codigos": codigos,
+        "por_pagina": layout.por_pagina,
+        "colunas": layout.colunas,
+        "linhas": layout.linhas,
+        "pixels": [layout.largura, layout.altura],
+    }
+
+def main(argv=None):
+    from .batch import ler_jobs, montar_payload
+
+    parser = argparse.ArgumentParser(description="Folhas de etiquetas com QR Codes (PDF/TIFF/PNG)")
+    parser.add_argument("entrada", help="arquivo .csv ou .jsonl com os jobs (coluna opcional: legenda)")
+    parser.add_argument("saida", help="arquivo .pdf, .tiff ou .png (PNG: um arquivo por página)")
+    parser.add_argument("--papel", default="A4", choices=sorted(PAPEIS))
+    parser.add_argument("--paisagem", action="store_true")
+    parser.add_argument("--dpi", type=int, default=600)
+    parser.add_argument("--lado-mm", type=float, default=20, help="lado do QR Code")
+    parser.add_argument("--margem-mm", type=float, default=10)
+    parser.add_argument("--espaco-mm", type=float, default=4, help="vão entre etiquetas")
+    parser.add_argument("--legenda-mm", type=float, default=3, help="altura da legenda (0 = sem legenda)")
+    parser.add_argument("--sem-marcas", action="store_true", help="não desenhar marcas de corte")
+    parser.add_argument("--ec", default="M", choices=("L", "M", "Q", "H"))
+    parser.add_argument("--estilo", default="quadrado")
+    parser.add_argument("--borda", type=int, default=2, help="zona de silêncio em módulos")
+    args = parser.parse_args(argv)
+
+    layout = LayoutFolha(args.papel, args.dpi, args.lado_mm, args.margem_mm, args.espaco_mm, args.legenda_mm,
+                    not args.sem_marcas, args.paisagem)
+
+    def itens():
+        for job in ler_jobs(args.entrada):
+            data = montar_payload(job)
+            yield data, job.get("legenda", data)
+
+    r = compor_folhas(itens(), args.saida, layout, args.ec, args.estilo, args.borda)
+    print(f"{r['codigos']} códigos em {r['paginas']} página(s), {r['colunas']}x{r['linhas']} por página")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import hashlib
+import os
+
+from PIL import Image
+
+from .cache import LRUCache
+
+LOGO_FATOR = 0.20
+
+# Logos já decodificados (largura None) e redimensionados, por (caminho,
+# mtime, tamanho do arquivo, largura alvo). Trocar o arquivo no disco muda a
+# chave. As imagens devolvidas são compartilhadas: não modificar.
+cache_logos = LRUCache(max_entries=64, max_bytes=64 * 1024 * 1024)
+
+def carregar_logo(logo_path, largura=None):
+    st = os.stat(logo_path)
+    key = (os.path.abspath(logo_path), st.st_mtime_ns, st.st_size, largura)
+    logo = cache_logos.get(key)
+    if logo is not None:
+        return logo
+
+    if largura:
+        logo = carregar_logo(logo_path).resize((largura, largura), Image.LANCZOS)
+    else:
+        with Image.open(logo_path) as f:
+            logo = f.convert("RGBA")
+    cache_logos.put(key, logo, nbytes=logo.size[0] * logo.size[1] * 4)
+    return logo
+
+# sha256 do conteúdo, pela mesma chave (caminho, mtime, tamanho): o mesmo
+# logo em caminhos diferentes dá a mesma chave de cache
+hashes_logos = LRUCache(max_entries=256)
+
+def hash_logo(logo_path):
+    st = os.stat(logo_path)
+    key = (os.path.abspath(logo_path), st.st_mtime_ns, st.st_size)
+    h = hashes_logos.get(key)
+    if h is None:
+        with open(logo_path, "rb") as f:
+            h = hashlib.file_digest(f, "sha256").hexdigest()
+        hashes_logos.put(key, h)
+    return h
+
+def aquecer_logos(caminhos):
+    # initializer dos workers do lote: cada processo decodifica os logos uma
+    # única vez; o redimensionamento por tamanho é feito sob demanda e cacheado
+    for caminho in caminhos:
+        try:
+            carregar_logo(caminho)
+        except OSError:
+            pass
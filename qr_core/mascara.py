@@ -0,0 +1,111 @@
+from functools import lru_cache
+
+import qrcode
+from qrcode import util
+
+from .raster import HAS_NUMPY
+
+# Escolha da máscara com NumPy. O qrcode monta a matriz 8 vezes (map_data em
+# Python puro) e pontua cada uma com util.lost_point, também em Python; nas
+# versões altas isso domina o tempo de codificação.
+#
+# Aqui a matriz é montada uma vez: como a máscara só inverte células de dados,
+# matriz(k) = sem_mascara ^ (mascara_k & regiao_dados). As 4 penalidades são
+# calculadas vetorizadas, com os mesmos critérios (e o mesmo desempate: a
+# primeira máscara de menor pontuação) de util.lost_point, então a máscara e
+# a matriz final são idênticas às do qrcode.
+
+np = None
+
+def _carregar_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+@lru_cache(maxsize=40)
+def _regiao_dados(version):
+    # células que map_data preenche: o que sobra como None depois dos padrões
+    # fixos e das áreas de formato/versão (mesma sequência de makeImpl)
+    qr = qrcode.QRCode(version=version, border=0)
+    n = qr.modules_count = version * 4 + 17
+    qr.modules = [[None] * n for _ in range(n)]
+    qr.setup_position_probe_pattern(0, 0)
+    qr.setup_position_probe_pattern(n - 7, 0)
+    qr.setup_position_probe_pattern(0, n - 7)
+    qr.setup_position_adjust_pattern()
+    qr.setup_timing_pattern()
+    qr.setup_type_info(True, 0)
+    if version >= 7:
+        qr.setup_type_number(True)
+    return np.array([[c is None for c in linha] for linha in qr.modules])
+
+@lru_cache(maxsize=40)
+def _mascaras(n):
+    # avaliadas célula a célula com as próprias funções do qrcode (uma vez por tamanho)
+    return tuple(
+        np.array([[f(i, j) for j in range(n)] for i in range(n)], dtype=bool)
+        for f in map(util.mask_func, range(8))
+    )
+
+# 1:1:3:1:1 com 4 claros antes ou depois, lido como inteiro de 11 bits
+_PADRAO_1 = 0b10111010000
+_PADRAO_2 = 0b00001011101
+
+def _sequencias(m):
+    # soma de (tamanho - 2) das sequências de 5+ módulos iguais nas linhas
+    n = m.shape[1]
+    troca = np.ones((m.shape[0], n + 1), dtype=bool)
+    troca[:, 1:-1] = m[:, 1:] != m[:, :-1]
+    tamanhos = np.diff(np.flatnonzero(troca))
+    longas = tamanhos[tamanhos >= 5]
+    return int(longas.sum()) - 2 * len(longas)
+
+def _finders(m):
+    n = m.shape[1]
+    if n < 11:
+        return 0
+    janela = np.zeros((m.shape[0], n - 10), dtype=np.int32)
+    for k in range(11):
+        janela |= m[:, k:k + n - 10].astype(np.int32) << (10 - k)
+    return int(np.count_nonzero((janela == _PADRAO_1) | (janela == _PADRAO_2)))
+
+def penalidade(m):
+    # equivalente a util.lost_point(m.tolist())
+    n = m.shape[0]
+    pontos = _sequencias(m) + _sequencias(m.T)
+    a = m[:-1, :-1]
+    pontos += 3 * int(np.count_nonzero((a == m[:-1, 1:]) & (a == m[1:, :-1]) & (a == m[1:, 1:])))
+    pontos += 40 * (_finders(m) + _finders(m.T))
+    percent = float(np.count_nonzero(m)) / (n ** 2)
+    pontos += int(abs(percent * 100 - 50) / 5) * 10
+    return pontos
+
+def montar(qr, mask_pattern=None):
+    # substitui qr.make(fit=False): preenche qr.modules e qr.data_cache.
+    # mask_pattern fixo pula a avaliação (útil num lote inteiro).
+    if mask_pattern is not None and mask_pattern not in range(8):
+        raise ValueError(f"Máscara QR inválida: {mask_pattern} (0-7)")
+    if not HAS_NUMPY:
+        qr.mask_pattern = mask_pattern
+        qr.make(fit=False)
+        return qr
+    _carregar_numpy()
+    qr.makeImpl(True, 0)
+    n = qr.modules_count
+    dados = _regiao_dados(qr.version)
+    mascaras = _mascaras(n)
+    sem_mascara = np.array(qr.modules, dtype=bool) ^ (mascaras[0] & dados)
+
+    if mask_pattern is None:
+        pontos = [penalidade(sem_mascara ^ (mascaras[k] & dados)) for k in range(8)]
+        mask_pattern = pontos.index(min(pontos))
+
+    # padrões fixos e dados vêm da matriz de teste; só faltam os bits reais
+    # de formato/versão, que dependem da máscara
+    qr.modules = (sem_mascara ^ (mascaras[mask_pattern] & dados)).tolist()
+    qr.setup_type_info(False, mask_pattern)
+    if qr.version >= 7:
+        qr.setup_type_number(False)
+    qr.mask_pattern = mask_pattern
+    return qr
@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+from collections import deque
+
+# Instrumentação opcional de codificar/renderizar/gerar_qrcode.
+# Sem hooks registrados, medir() devolve um contexto nulo e as funções só
+# pagam um teste de lista vazia. Com hooks, cada chamada externa gera um
+# evento (dict) com a duração de cada etapa e dados do QR:
+#   {"etapas": {"encode": s, "raster": s, ...}, "total": s, "versao": 5,
+#    "modulos": 37, "largura": 400, "altura": 400, "bytes_imagem": 640000, ...}
+# Chamadas aninhadas (gerar_qrcode -> codificar -> renderizar) na mesma
+# thread somam no mesmo evento.
+
+_hooks = []
+_local = threading.local()
+
+def adicionar_hook(hook):
+    # hook(evento) roda na thread do render; exceções do hook são ignoradas
+    if hook not in _hooks:
+        _hooks.append(hook)
+    return hook
+
+def remover_hook(hook):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+class Medicao:
+    __slots__ = ("etapas", "info", "inicio", "_t", "_nivel")
+
+    def __init__(self):
+        self.etapas = {}
+        self.info = {}
+        self.inicio = self._t = time.perf_counter()
+        self._nivel = 0
+
+    def marcar(self, etapa):
+        # tempo desde a marca anterior (ou desde o início da chamada) vai para `etapa`
+        agora = time.perf_counter()
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + agora - self._t
+        self._t = agora
+
+    def __enter__(self):
+        self._nivel += 1
+        self._t = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        self._nivel -= 1
+        if self._nivel:
+            return
+        _local.medicao = None
+        evento = dict(self.info, etapas=self.etapas, total=time.perf_counter() - self.inicio)
+        if tipo is not None:
+            evento["erro"] = tipo.__name__
+        for hook in tuple(_hooks):
+            try:
+                hook(evento)
+            except Exception:
+                pass
+
+class _Nulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        pass
+
+_NULO = _Nulo()
+
+def medir():
+    # uso: with medir() as med: ... if med: med.marcar("etapa")
+    if not _hooks:
+        return _NULO
+    med = getattr(_local, "medicao", None)
+    if med is None:
+        med = _local.medicao = Medicao()
+    return med
+
+def _quantil(ordenados, q):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+class Estatisticas:
+    # Hook acumulador: contagem e soma por etapa desde o início, quantis
+    # (p50/p90/p99) sobre as últimas `janela` amostras de cada etapa.
+
+    QUANTIS = (0.5, 0.9, 0.99)
+
+    def __init__(self, janela=2048):
+        self.janela = janela
+        self._lock = threading.Lock()
+        self.limpar()
+
+    def limpar(self):
+        with self._lock:
+            self._amostras = {}
+            self._contagem = {}
+            self._soma = {}
+            self._versoes = {}
+            self.eventos = 0
+            self.erros = 0
+            self.bytes_imagem = 0
+
+    def __call__(self, evento):
+        with self._lock:
+            self.eventos += 1
+            if "erro" in evento:
+                self.erros += 1
+            for etapa, s in list(evento["etapas"].items()) + [("total", evento["total"])]:
+                if etapa not in self._amostras:
+                    self._amostras[etapa] = deque(maxlen=self.janela)
+                    self._contagem[etapa] = 0
+                    self._soma[etapa] = 0.0
+                self._amostras[etapa].append(s)
+                self._contagem[etapa] += 1
+                self._soma[etapa] += s
+            if "versao" in evento:
+                self._versoes[evento["versao"]] = self._versoes.get(evento["versao"], 0) + 1
+            self.bytes_imagem += evento.get("bytes_imagem", 0)
+
+    def resumo(self):
+        with self._lock:
+            etapas = {}
+            for etapa, amostras in self._amostras.items():
+                ordenados = sorted(amostras)
+                etapas[etapa] = dict(
+                    {f"p{int(q * 100)}_ms": round(_quantil(ordenados, q) * 1000, 3) for q in self.QUANTIS},
+                    contagem=self._contagem[etapa],
+                    soma_s=round(self._soma[etapa], 6),
+                )
+            return {
+                "eventos": self.eventos,
+                "erros": self.erros,
+                "bytes_imagem": self.bytes_imagem,
+                "versoes": {str(v): n for v, n in sorted(self._versoes.items())},
+                "etapas": etapas,
+            }
+
+    def json(self):
+        return json.dumps(self.resumo(), ensure_ascii=False)
+
+    def prometheus(self, prefixo="qrcode"):
+        r = self.resumo()
+        linhas = [
+            f"# HELP {prefixo}_etapa_segundos Duração de cada etapa do render.",
+            f"# TYPE {prefixo}_etapa_segundos summary",
+        ]
+        with self._lock:
+            for etapa, amostras in self._amostras.items():
+                ordenados = sorted(amostras)
+                for q in self.QUANTIS:
+                    linhas.append(f'{prefixo}_etapa_segundos{{etapa="{etapa}",quantile="{q}"}} {_quantil(ordenados, q):.6g}')
+                linhas.append(f'{prefixo}_etapa_segundos_sum{{etapa="{etapa}"}} {self._soma[etapa]:.6g}')
+                linhas.append(f'{prefixo}_etapa_segundos_count{{etapa="{etapa}"}} {self._contagem[etapa]}')
+        linhas += [
+            f"# TYPE {prefixo}_eventos_total counter",
+            f"{prefixo}_eventos_total {r['eventos']}",
+            f"# TYPE {prefixo}_erros_total counter",
+            f"{prefixo}_erros_total {r['erros']}",
+            f"# TYPE {prefixo}_imagem_bytes_total counter",
+            f"{prefixo}_imagem_bytes_total {r['bytes_imagem']}",
+            f"# TYPE {prefixo}_versao_total counter",
+        ]
+        linhas += [f'{prefixo}_versao_total{{versao="{v}"}} {n}' for v, n in r["versoes"].items()]
+        return "\n".join(linhas) + "\n"
+
+def ativar(janela=2048):
+    # atalho: registra e devolve um Estatisticas
+    return adicionar_hook(Estatisticas(janela))
@@ -0,0 +1,19 @@
+from .pix import recebedor
+
+# o BR Code do PIX é montado nativamente (qr_core.pix); mantido por compatibilidade
+HAS_PIX = True
+
+def get_wifi_string(ssid, password, security):
+    return f"WIFI:T:{security};S:{ssid};P:{password};;"
+
+def get_tel_string(tel):
+    return f"tel:{tel}"
+
+def get_mailto_string(email):
+    return f"mailto:{email}"
+
+def get_vcard_string(name, phone, email):
+    return f"BEGIN:VCARD\nVERSION:3.0\nN:{name}\nTEL:{phone}\nEMAIL:{email}\nEND:VCARD"
+
+def get_pix_string(chave, nome, cidade, valor, txid="***"):
+    return recebedor(str(chave or "").strip(), nome, cidade).payload(valor, txid)
@@ -0,0 +1,87 @@
+import unicodedata
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+# BR Code (EMV-MPM) do PIX estático, montado direto em texto.
+# Campos fixos do recebedor (chave, nome, cidade) são pré-calculados uma vez,
+# junto com o estado do CRC até eles; cada cobrança só acrescenta valor, txid
+# e o checksum.
+
+def _tabela_crc():
+    tabela = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        tabela.append(crc & 0xFFFF)
+    return tuple(tabela)
+
+CRC_TABELA = _tabela_crc()
+
+def crc16(dados, crc=0xFFFF):
+    # CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), exigido pelo BR Code
+    for b in dados:
+        crc = ((crc << 8) & 0xFFFF) ^ CRC_TABELA[((crc >> 8) ^ b) & 0xFF]
+    return crc
+
+def _tlv(id_, valor):
+    if len(valor) > 99:
+        raise ValueError(f"Campo {id_} do BR Code excede 99 caracteres")
+    return f"{id_}{len(valor):02d}{valor}"
+
+def _texto(valor, campo, limite):
+    # o BR Code só aceita ASCII: remove acentos em vez de rejeitar "São Paulo"
+    valor = unicodedata.normalize("NFKD", str(valor or "").strip())
+    valor = valor.encode("ascii", "ignore").decode()
+    if not valor:
+        raise ValueError(f"{campo} do PIX é obrigatório")
+    if len(valor) > limite:
+        raise ValueError(f"{campo} do PIX deve ter no máximo {limite} caracteres")
+    if not valor.isprintable():
+        raise ValueError(f"{campo} do PIX contém caracteres inválidos")
+    return valor
+
+def formatar_valor(valor):
+    if valor is None or str(valor).strip() == "":
+        return None
+    try:
+        v = Decimal(str(valor).strip().replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"Valor PIX inválido: {valor}") from None
+    if not v.is_finite() or v <= 0:
+        raise ValueError(f"Valor PIX inválido: {valor}")
+    if v.adjusted() >= 10:  # o campo 54 tem até 13 caracteres: 9999999999.99
+        raise ValueError(f"Valor PIX muito alto: {valor}")
+    centavos = v.quantize(Decimal("0.01"))
+    if centavos != v:
+        # sem arredondar em silêncio: "1.005" ou "0.001" não viram outro valor
+        raise ValueError(f"Valor PIX com mais de 2 casas decimais: {valor}")
+    return f"{centavos}"
+
+class PixRecebedor:
+    def __init__(self, chave, nome, cidade):
+        chave = str(chave or "").strip()
+        if not chave:
+            raise ValueError("Chave PIX é obrigatória")
+        if len(chave) > 77 or not chave.isascii() or not chave.isprintable():
+            raise ValueError(f"Chave PIX inválida: {chave}")
+        nome = _texto(nome, "Nome", 25)
+        cidade = _texto(cidade, "Cidade", 15)
+
+        conta = _tlv("00", "br.gov.bcb.pix") + _tlv("01", chave)
+        self._inicio = "000201" + _tlv("26", conta) + "52040000" + "5303986"
+        self._fim = "5802BR" + _tlv("59", nome) + _tlv("60", cidade)
+        self._crc_inicio = crc16(self._inicio.encode())
+
+    def payload(self, valor=None, txid="***"):
+        txid = str(txid or "***")
+        if txid != "***" and (len(txid) > 25 or not txid.isascii() or not txid.isalnum()):
+            raise ValueError(f"txid PIX inválido: {txid}")
+        valor = formatar_valor(valor)
+        resto = (_tlv("54", valor) if valor else "") + self._fim + _tlv("62", _tlv("05", txid)) + "6304"
+        crc = crc16(resto.encode(), self._crc_inicio)
+        return f"{self._inicio}{resto}{crc:04X}"
+
+@lru_cache(maxsize=256)
+def recebedor(chave, nome, cidade):
+    return PixRecebedor(chave, nome, cidade)
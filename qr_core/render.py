@@ -0,0 +1,240 @@
+from collections import namedtuple
+
+import qrcode
+from PIL import Image, ImageColor
+from qrcode.image.styles.moduledrawers import (
+    CircleModuleDrawer,
+    GappedSquareModuleDrawer,
+    RoundedModuleDrawer,
+    SquareModuleDrawer,
+)
+
+from .cache import LRUCache
+from .capacidade import EC_DICT, dados_qr, planejar
+from .logo import LOGO_FATOR, carregar_logo
+from .mascara import montar
+from .metricas import medir
+from .raster import HAS_NUMPY, renderizar_matriz
+
+# Classes (não instâncias): os drawers guardam a imagem em initialize(),
+# então cada render cria o seu para poder rodar em paralelo.
+MODS = {
+    "quadrado": SquareModuleDrawer,
+    "gapped": GappedSquareModuleDrawer,
+    "circulo": CircleModuleDrawer,
+    "arredondado": RoundedModuleDrawer
+}
+
+# Resultado da etapa de codificação: só depende de (data, EC, versão), nunca
+# de cor, tamanho, borda, logo ou estilo. modules é imutável (tupla de tuplas).
+QRCodificado = namedtuple("QRCodificado", ["version", "error_correction", "modules", "codewords"])
+
+cache_matrizes = LRUCache(max_entries=1024, max_bytes=32 * 1024 * 1024)
+
+def codificar(data, error_correction='H', version=None, usar_cache=True, mask_pattern=None):
+    with medir() as med:
+        key = (data, error_correction, version, mask_pattern)
+        cod = cache_matrizes.get(key) if usar_cache else None
+        if cod is None:
+            # versão e segmentação vêm do planejador (qr_core.capacidade),
+            # sem a busca por tentativa de make(fit=True)
+            plano = planejar(data, error_correction, version)
+            qr = qrcode.QRCode(version=plano.version, error_correction=plano.error_correction, border=0)
+            for parte in dados_qr(plano):
+                qr.add_data(parte)
+            # máscara avaliada com NumPy (qr_core.mascara); mask_pattern fixo pula a avaliação
+            montar(qr, mask_pattern)
+
+            cod = QRCodificado(qr.version, qr.error_correction, tuple(map(tuple, qr.modules)), qr.data_cache)
+            # ~8 bytes por referência em cada linha + os codewords
+            if usar_cache:
+                cache_matrizes.put(key, cod, nbytes=qr.modules_count ** 2 * 8 + len(data) + len(cod.codewords))
+            if med:
+                med.marcar("encode")
+        elif med:
+            med.marcar("encode_cache")
+        if med:
+            med.info.update(versao=cod.version, modulos=len(cod.modules), bytes_payload=len(data))
+        return cod
+
+def _qr_montado(cod, box_size, border):
+    # QRCode já "compilado" a partir do cache, para o caminho StyledPilImage
+    qr = qrcode.QRCode(
+        version=cod.version,
+        error_correction=cod.error_correction,
+        box_size=box_size,
+        border=border,
+    )
+    qr.modules = cod.modules
+    qr.modules_count = len(cod.modules)
+    qr.data_cache = cod.codewords
+    return qr
+
+def _make_image_styled(cod, box_size, border, module_style, fg_rgb, bg_rgb):
+    # StyledPilImage e as máscaras de cor só carregam quando o motor styled é usado
+    from qrcode.image.styledpil import StyledPilImage
+    from qrcode.image.styles.colormasks import SolidFillColorMask
+
+    return _qr_montado(cod, box_size, border).make_image(
+        image_factory=StyledPilImage,
+        module_drawer=MODS.get(module_style, SquareModuleDrawer)(),
+        color_mask=SolidFillColorMask(fg_rgb, bg_rgb),
+    )
+
+# Modos de saída. "RGBA" é o padrão histórico. "1" (preto e branco) e "P"
+# (paleta de 2 entradas com fg/bg) usam 1 byte por pixel (ou 1 bit) em vez
+# de 4; como não comportam reamostragem, forçam box_size inteiro (como o
+# render "exato"). "auto" escolhe 1/P só quando o resultado seria idêntico ao
+# RGBA: sem logo, sem reamostragem e sem antialias (os drawers círculo e
+# arredondado do motor styled suavizam as bordas); senão fica RGBA.
+MODOS_IMAGEM = ("RGBA", "auto", "1", "P")
+
+def _modo_saida(image_mode, logo_path, sem_reamostragem, fg_rgb, bg_rgb):
+    if image_mode not in MODOS_IMAGEM:
+        raise ValueError(f"image_mode inválido: {image_mode}")
+    preto_branco = tuple(fg_rgb[:3]) == (255, 255, 255) and tuple(bg_rgb[:3]) == (0, 0, 0)
+    if image_mode == "1" and not preto_branco:
+        raise ValueError("image_mode '1' exige fg_color branco e bg_color preto; use 'P'")
+    # o logo precisa de canal alfa e de cores intermediárias
+    if image_mode == "RGBA" or logo_path:
+        return "RGBA"
+    if image_mode == "auto":
+        if not sem_reamostragem:
+            return "RGBA"
+        return "1" if preto_branco else "P"
+    return image_mode
+
+def _para_paleta(img, fg_rgb, bg_rgb):
+    # saída do StyledPilImage (RGB) -> "P" de 2 entradas; tons intermediários
+    # (antialias do círculo) vão para a cor mais próxima
+    pal = Image.new("P", (1, 1))
+    pal.putpalette(tuple(fg_rgb[:3]) + tuple(bg_rgb[:3]))
+    return img.convert("RGB").quantize(palette=pal, dither=Image.Dither.NONE)
+
+def renderizar(
+        cod,
+        size=400,
+        fg_color="#FFFFFF",
+        bg_color="#000000",
+        border=4,
+        module_style="quadrado",
+        logo_path=None,
+        auto_resize_logo=True,
+        box_size=10,
+        render_mode="lanczos",
+        engine="styled",
+        image_mode="RGBA"
+    ):
+    with medir() as med:
+        fg_rgb = ImageColor.getrgb(fg_color)
+        bg_rgb = ImageColor.getrgb(bg_color)
+
+        # "exato": box_size derivado do tamanho final, sem reamostragem LANCZOS;
+        # o que sobrar da divisão inteira vira margem extra centralizada. Os
+        # drawers do qrcode precisam de 2 px por módulo (o gapped quebra com 1):
+        # abaixo disso o motor styled volta ao caminho com redimensionamento
+        numpy = engine == "numpy" and HAS_NUMPY
+        box_min = 1 if numpy else 2
+        modulos = len(cod.modules) + 2 * border
+        cabe = size >= modulos * box_min
+        exato = render_mode == "exato" and cabe
+        box_size = max(box_size, box_min)
+        duas_cores = numpy or module_style not in ("circulo", "arredondado")
+        modo = _modo_saida(image_mode, logo_path, duas_cores and (exato or size == modulos * box_size),
+                           fg_rgb, bg_rgb)
+        if modo != "RGBA" and cabe:
+            exato = True
+        if exato:
+            box_size = size // modulos
+
+        if numpy:
+            img = renderizar_matriz(cod.modules, box_size, fg_rgb, bg_rgb, module_style, border)
+            if med:
+                med.marcar("raster")
+        else:
+            img = _make_image_styled(cod, box_size, border, module_style, fg_rgb, bg_rgb)
+            if med:
+                med.marcar("make_image")
+        if modo == "RGBA":
+            img = img.convert("RGBA")
+            fundo = ImageColor.getcolor(fg_color, "RGBA")
+        else:
+            if img.mode != "P":
+                img = _para_paleta(img, fg_rgb, bg_rgb)
+            if modo == "1":
+                img = img.convert("1", dither=Image.Dither.NONE)
+            fundo = 255 if modo == "1" else 0
+        if med:
+            med.marcar("convert")
+
+        if exato:
+            if img.size != (size, size):
+                canvas = Image.new(img.mode, (size, size), fundo)
+                if img.mode == "P":
+                    canvas.putpalette(img.getpalette())
+                off = (size - img.size[0]) // 2
+                canvas.paste(img, (off, off))
+                img = canvas
+            if med:
+                med.marcar("margem")
+        elif img.size != (size, size):
+            # 1/P só aceitam vizinho mais próximo (menor que 1 px por módulo)
+            img = img.resize((size, size), Image.LANCZOS if modo == "RGBA" else Image.NEAREST)
+            if med:
+                med.marcar("resize")
+
+        if logo_path:
+            try:
+                lw = int(img.size[0] * LOGO_FATOR) if auto_resize_logo else None
+                logo = carregar_logo(logo_path, lw)
+                px, py = (img.size[0] - logo.size[0]) // 2, (img.size[1] - logo.size[1]) // 2
+                img.alpha_composite(logo, (px, py))
+            except Exception:
+                pass
+            if med:
+                med.marcar("logo")
+
+        if med:
+            med.info.update(
+                versao=cod.version, modulos=len(cod.modules), engine=engine, estilo=module_style,
+                largura=img.size[0], altura=img.size[1],
+                modo=img.mode,
+                bytes_imagem=((img.size[0] + 7) // 8 if img.mode == "1" else img.size[0] * len(img.getbands()))
+                * img.size[1],
+            )
+        return img
+
+def gerar_qrcode(
+        data,
+        size=400,
+        fg_color="#FFFFFF",
+        bg_color="#000000",
+        border=4,
+        module_style="quadrado",
+        logo_path=None,
+        auto_resize_logo=True,
+        error_correction='H',
+        box_size=10,
+        render_mode="lanczos",
+        engine="styled",
+        version=None,
+        mask_pattern=None,
+        image_mode="RGBA"
+    ):
+    # com métricas ativas, codificar e renderizar contam como um só evento
+    with medir():
+        cod = codificar(data, error_correction, version, mask_pattern=mask_pattern)
+        return renderizar(
+            cod,
+            size=size,
+            fg_color=fg_color,
+            bg_color=bg_color,
+            border=border,
+            module_style=module_style,
+            logo_path=logo_path,
+            auto_resize_logo=auto_resize_logo,
+            box_size=box_size,
+            render_mode=render_mode,
+            engine=engine,
+            image_mode=image_mode,
+        )
@@ -0,0 +1,232 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import ImageColor
+
+from .batch import ESTILO, TIPOS, chave_job, montar_payload, opcoes_estilo, renderizar_job
+from .cache import CacheDisco, LRUCache
+from .export import FORMATOS
+from .metricas import Estatisticas, adicionar_hook, remover_hook
+
+# Serviço HTTP local: GET /qr?type=pix&chave=...&size=300&fmt=png|svg|jpg|pdf
+# Mesmos tipos e opções do lote (qr_core.batch). Não importa nada do Tk.
+
+TIPOS_MIME = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+}
+
+# padrões do serviço: motor rápido, sem reamostragem, imagem de 1 bit/paleta
+PADROES = {"engine": "numpy", "render_mode": "exato", "image_mode": "auto"}
+
+MAX_SIZE = 2048
+MAX_BORDA = 16
+
+# logo_path fica de fora: o cliente não escolhe arquivos do servidor. Motor,
+# modo de render e box_size são os de PADROES: com box_size livre e
+# render_mode=lanczos um único pedido alocava imagens de gigabytes
+CAMPOS = {"tipo", "data"} | {c for _, campos in TIPOS.values() for c in campos} | (
+    set(ESTILO) - {"logo_path", "box_size", "render_mode", "engine"})
+
+def normalizar(query):
+    # devolve (chave de cache, job pronto para renderizar_job, formato)
+    q = {k: v[-1] for k, v in parse_qs(query, keep_blank_values=True).items()}
+    if "type" in q:
+        q.setdefault("tipo", q.pop("type"))
+    fmt = q.pop("fmt", "png").lower()
+    if fmt == "jpeg":
+        fmt = "jpg"
+    if fmt not in FORMATOS:
+        raise ValueError(f"Formato inválido: {fmt}")
+    desconhecidos = set(q) - CAMPOS
+    if desconhecidos:
+        raise ValueError(f"Parâmetros desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    job = dict(PADROES)
+    job.update(q)
+    try:
+        opts = opcoes_estilo(job)
+    except ValueError:
+        raise ValueError("Opção de estilo inválida") from None
+    if not 16 <= opts.get("size", 400) <= MAX_SIZE:
+        raise ValueError(f"size deve estar entre 16 e {MAX_SIZE}")
+    if not 0 <= opts.get("border", 4) <= MAX_BORDA:
+        raise ValueError(f"border deve estar entre 0 e {MAX_BORDA}")
+    for k in ("fg_color", "bg_color"):
+        # forma canônica #RRGGBB[AA], como em chave_job (vai para o SVG e para a chave de cache)
+        if k in opts:
+            try:
+                opts[k] = "#" + "".join(f"{c:02X}" for c in ImageColor.getrgb(opts[k]))
+            except ValueError:
+                raise ValueError(f"{k} inválido") from None
+    data = montar_payload(job)
+    if not data:
+        raise ValueError("Payload vazio")
+    chave = (fmt, data, tuple(sorted(opts.items())))
+    return chave, dict(opts, data=data), fmt
+
+class OcupadoError(Exception):
+    pass
+
+class ServidorQR(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, endereco, workers=None, processos=False, fila=None, cache_mb=64, timeout=30,
+                 cache_disco=None):
+        super().__init__(endereco, _Handler)
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor if processos else ThreadPoolExecutor
+        self.executor = pool(max_workers=workers)
+        # contrapressão: além de `fila` renders pendentes, responde 503 na hora
+        self.vagas = threading.BoundedSemaphore(fila or workers * 4)
+        self.cache = LRUCache(max_entries=10000, max_bytes=cache_mb * 1024 * 1024)
+        # segundo nível, persistente entre reinícios (CacheDisco ou None)
+        self.disco = cache_disco
+        self.timeout = timeout
+        self.verbose = False
+        # tempos por etapa de cada render (GET /metrics); com processos os
+        # renders rodam em outros processos e as etapas não aparecem aqui
+        self.metricas = adicionar_hook(Estatisticas())
+        self._em_andamento = {}
+        self._lock = threading.Lock()
+
+    def obter(self, chave, job, fmt):
+        # devolve (bytes, etag) do cache ou renderiza; pedidos idênticos
+        # simultâneos compartilham o mesmo render
+        item = self.cache.get(chave)
+        if item is not None:
+            return item
+        chave_disco = None
+        if self.disco is not None:
+            chave_disco = chave_job(job, fmt)
+            dados = self.disco.get(chave_disco)
+            if dados is not None:
+                item = (dados, '"%s"' % hashlib.sha1(dados).hexdigest())
+                self.cache.put(chave, item, nbytes=len(dados))
+                return item
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+            dono = futuro is None
+            if dono:
+                if not self.vagas.acquire(blocking=False):
+                    raise OcupadoError()
+                try:
+                    futuro = self.executor.submit(renderizar_job, job, fmt)
+                except BaseException:
+                    self.vagas.release()
+                    raise
+                self._em_andamento[chave] = futuro
+        if dono:
+            # a vaga só volta quando o render termina de fato: depois de um
+            # timeout ele continua ocupando o executor (fora do _lock, porque
+            # o callback roda na hora se o futuro já terminou)
+            futuro.add_done_callback(lambda f: self._terminou(chave, f))
+        dados = futuro.result(timeout=self.timeout)
+        item = (dados, '"%s"' % hashlib.sha1(dados).hexdigest())
+        if dono:
+            self.cache.put(chave, item, nbytes=len(dados))
+            if chave_disco is not None:
+                self.disco.put(chave_disco, dados)
+        return item
+
+    def _terminou(self, chave, futuro):
+        with self._lock:
+            if self._em_andamento.get(chave) is futuro:
+                del self._em_andamento[chave]
+        self.vagas.release()
+
+    def server_close(self):
+        super().server_close()
+        remover_hook(self.metricas)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "gerador-qrcode"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            stats = {"cache": self.server.cache.stats(), "render": self.server.metricas.resumo()}
+            if self.server.disco is not None:
+                stats["disco"] = self.server.disco.stats()
+            return self._json(200, stats)
+        if url.path == "/metrics":
+            dados = self.server.metricas.prometheus().encode()
+            return self._responder(200, dados, "text/plain; version=0.0.4; charset=utf-8", {})
+        if url.path != "/qr":
+            return self._json(404, {"erro": "Não encontrado"})
+
+        try:
+            chave, job, fmt = normalizar(url.query)
+            dados, etag = self.server.obter(chave, job, fmt)
+        except ValueError as e:
+            return self._json(400, {"erro": str(e)})
+        except OcupadoError:
+            return self._json(503, {"erro": "Servidor ocupado"}, {"Retry-After": "1"})
+        except TimeoutError:
+            # o render segue na fila e ocupa a vaga até terminar: mesma contrapressão
+            return self._json(503, {"erro": "Tempo esgotado"}, {"Retry-After": "1"})
+        except Exception as e:
+            return self._json(500, {"erro": f"{type(e).__name__}: {e}"})
+
+        cabecalhos = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+        if etag in self.headers.get("If-None-Match", ""):
+            return self._responder(304, b"", None, cabecalhos)
+        self._responder(200, dados, TIPOS_MIME[fmt], cabecalhos)
+
+    def _json(self, status, corpo, cabecalhos=None):
+        dados = json.dumps(corpo, ensure_ascii=False).encode()
+        self._responder(status, dados, "application/json; charset=utf-8", cabecalhos or {})
+
+    def _responder(self, status, dados, tipo, cabecalhos):
+        self.send_response(status)
+        if tipo:
+            self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        for k, v in cabecalhos.items():
+            self.send_header(k, v)
+        self.end_headers()
+        if dados:
+            self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP de QR Codes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="renders simultâneos (padrão: nº de CPUs)")
+    parser.add_argument("--processos", action="store_true", help="renderizar em processos em vez de threads")
+    parser.add_argument("--fila", type=int, default=None, help="renders pendentes antes de responder 503")
+    parser.add_argument("--cache-mb", type=int, default=64, help="limite do cache de respostas em MB")
+    parser.add_argument("--cache-disco", default=None, metavar="DIR",
+                        help="cache persistente das respostas, mantido entre reinícios")
+    parser.add_argument("--cache-disco-mb", type=int, default=512, help="limite do cache em disco em MB")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    servidor = ServidorQR((args.host, args.port), workers=args.workers, processos=args.processos,
+                          fila=args.fila, cache_mb=args.cache_mb,
+                          cache_disco=CacheDisco(args.cache_disco, args.cache_disco_mb * 1024 * 1024)
+                          if args.cache_disco else None)
+    servidor.verbose = args.verbose
+    print(f"Servindo em http://{args.host}:{servidor.server_port}/qr")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+if __name__ == "__main__":
+    main()
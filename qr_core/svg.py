@@ -0,0 +1,43 @@
+# Gerador de SVG puro (só texto): não depende de Pillow nem de qrcode.
+
+def _is_eye(n, row, col):
+    return (row < 7 and col < 7) or (row < 7 and col >= n - 7) or (row >= n - 7 and col < 7)
+
+def gerar_svg(cod, fg_color="#FFFFFF", bg_color="#000000", border=4, module_style="quadrado", size=None):
+    # SVG vetorial direto da matriz codificada, sem passar por imagem.
+    # Mesma convenção de cores de gerar_qrcode: fg é o fundo, bg os módulos.
+    # "arredondado" sai como quadrado; os olhos são sempre quadrados.
+    n = len(cod.modules)
+    total = n + 2 * border
+    partes = []
+    for r, linha in enumerate(cod.modules):
+        y = r + border
+        c = 0
+        while c < n:
+            if not linha[c]:
+                c += 1
+                continue
+            x = c + border
+            if module_style == "circulo" and not _is_eye(n, r, c):
+                partes.append(f"M{x},{y + 0.5:g}a.5,.5 0 1,0 1,0a.5,.5 0 1,0 -1,0z")
+                c += 1
+            elif module_style == "gapped" and not _is_eye(n, r, c):
+                partes.append(f"M{x + 0.1:g},{y + 0.1:g}h.8v.8h-.8z")
+                c += 1
+            else:
+                ini = c
+                while c < n and linha[c] and (module_style in ("quadrado", "arredondado") or _is_eye(n, r, c)):
+                    c += 1
+                partes.append(f"M{x},{y}h{c - ini}v1h-{c - ini}z")
+    lado = size or total * 10
+    # cores vêm de CSV/JSONL e de query string: escapadas, nunca viram marcação.
+    # Importado aqui: xml.sax custa ~20 ms no import de qr_core.svg (bench importacao)
+    from xml.sax.saxutils import quoteattr
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{lado}" height="{lado}" '
+        f'viewBox="0 0 {total} {total}" shape-rendering="crispEdges">'
+        f'<rect width="{total}" height="{total}" fill={quoteattr(str(fg_color))}/>'
+        f'<path fill={quoteattr(str(bg_color))} d="{"".join(partes)}"/>'
+        '</svg>\n'
+    )
@@ -1,116 +1,38 @@
-import io
 import os
+import queue
+import threading
 from tkinter import colorchooser, filedialog
 
 import customtkinter as ctk
-import qrcode
-from PIL import Image, ImageColor, ImageTk
-from qrcode.image.styledpil import StyledPilImage
-from qrcode.image.styles.colormasks import SolidFillColorMask
-from qrcode.image.styles.moduledrawers import (
-    CircleModuleDrawer,
-    GappedSquareModuleDrawer,
-    RoundedModuleDrawer,
-    SquareModuleDrawer,
+from PIL import Image, ImageTk
+
+from qr_core import (
+    HAS_NUMPY,
+    codificar,
+    get_mailto_string,
+    get_pix_string,
+    get_tel_string,
+    get_vcard_string,
+    get_wifi_string,
+    renderizar,
 )
+from qr_core.export import SVG_OPCOES, bytes_imagem, formato_de, salvar_imagem
+from qr_core.svg import gerar_svg
 
-try:
-    from brcode import Pix
-    HAS_PIX = True
-except ImportError:
-    HAS_PIX = False
+# reexportados: scripts antigos fazem "from qr_desktop import gerar_qrcode, get_pix_string"
+from qr_core import HAS_PIX, gerar_qrcode  # noqa: F401
 
-ctk.set_appearance_mode("system")
-ctk.set_default_color_theme("blue")
+PREVIEW_MAX = 500
+PREVIEW_DEBOUNCE_MS = 120
+POLL_MS = 30
+LIVE_DEBOUNCE_MS = 150
 
-def get_wifi_string(ssid, password, security):
-    return f"WIFI:T:{security};S:{ssid};P:{password};;"
-
-def get_tel_string(tel):
-    return f"tel:{tel}"
-
-def get_mailto_string(email):
-    return f"mailto:{email}"
-
-def get_vcard_string(name, phone, email):
-    return f"BEGIN:VCARD\nVERSION:3.0\nN:{name}\nTEL:{phone}\nEMAIL:{email}\nEND:VCARD"
-
-def get_pix_string(chave, nome, cidade, valor):
-    if HAS_PIX:
-        try:
-            pix = Pix(
-                key=chave,
-                name=nome,
-                city=cidade,
-                amount=float(valor) if valor else None
-            )
-            return pix.payload()
-        except Exception:
-            return f"PIX:{chave}|NOME:{nome}|CIDADE:{cidade}|VALOR:{valor}"
-    else:
-        return f"PIX:{chave}|NOME:{nome}|CIDADE:{cidade}|VALOR:{valor}"
-
-def gerar_qrcode(
-        data,
-        size=400,
-        fg_color="#FFFFFF",
-        bg_color="#000000",
-        border=4,
-        module_style="quadrado",
-        logo_path=None,
-        auto_resize_logo=True,
-        error_correction='H',
-        box_size=10
-    ):
-    MODS = {
-        "quadrado": SquareModuleDrawer(),
-        "gapped": GappedSquareModuleDrawer(),
-        "circulo": CircleModuleDrawer(),
-        "arredondado": RoundedModuleDrawer()
-    }
-    drawer = MODS.get(module_style, SquareModuleDrawer())
-
-    EC_DICT = {
-        'L': qrcode.constants.ERROR_CORRECT_L,
-        'M': qrcode.constants.ERROR_CORRECT_M,
-        'Q': qrcode.constants.ERROR_CORRECT_Q,
-        'H': qrcode.constants.ERROR_CORRECT_H,
-    }
-
-    qr = qrcode.QRCode(
-        version=None,
-        error_correction=EC_DICT.get(error_correction, qrcode.constants.ERROR_CORRECT_H),
-        box_size=box_size,
-        border=border,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-
-    fg_rgb = ImageColor.getrgb(fg_color)
-    bg_rgb = ImageColor.getrgb(bg_color)
-
-    img = qr.make_image(
-        image_factory=StyledPilImage,
-        module_drawer=drawer,
-        color_mask=SolidFillColorMask(fg_rgb, bg_rgb),
-    ).convert("RGBA")
-
-    img = img.resize((size, size), Image.LANCZOS)
-
-    if logo_path:
-        try:
-            logo = Image.open(logo_path).convert("RGBA")
-            if auto_resize_logo:
-                factor = 0.20
-                w, h = img.size
-                lw = int(w * factor)
-                logo = logo.resize((lw, lw), Image.LANCZOS)
-            px, py = (img.size[0] - logo.size[0]) // 2, (img.size[1] - logo.size[1]) // 2
-            img.alpha_composite(logo, (px, py))
-        except Exception:
-            pass
-
-    return img
+def _reduzir(img, alvo):
+    # "1"/"P" só redimensionam por vizinho mais próximo; a prévia passa por
+    # RGB para manter o LANCZOS (a imagem original continua compacta)
+    if img.mode in ("1", "P"):
+        img = img.convert("RGB")
+    return img.resize((alvo, alvo), Image.LANCZOS)
 
 class QRCodeApp(ctk.CTk):
     def __init__(self):
@@ -129,8 +51,22 @@ class QRCodeApp(ctk.CTk):
         self.box_size_var = ctk.IntVar(value=10)
         self.size_var = ctk.IntVar(value=400)
 
+        # Preview: imagem já no tamanho de exibição, gerada fora da thread do Tk
+        self._preview_after = None
+        self._preview_fonte = None
+        self._preview_pil = None
+        self._preview_chave = None
+        self._geracao = 0
+        self._pendentes = 0
+        self._resultados = queue.Queue()
+        self._pedido_atual = None
+        self._ultimo_pedido = None
+        self.live_var = ctk.BooleanVar(value=False)
+        self._live_after = None
+
         self._build_ui()
         self._bind_resize()
+        self._bind_live()
 
     def _build_ui(self):
         topbar = ctk.CTkFrame(self, fg_color="transparent", height=56)
@@ -285,13 +221,47 @@ class QRCodeApp(ctk.CTk):
         self.copy_btn.grid(row=1, column=1, sticky="ew", padx=2, pady=2)
         self.limpar_btn = ctk.CTkButton(btns, text="Limpar", command=self._limpar, fg_color="#F59E42")
         self.limpar_btn.grid(row=1, column=2, sticky="ew", padx=2, pady=2)
+        live_switch = ctk.CTkSwitch(btns, text="Ao vivo", variable=self.live_var, command=self._ao_mudar)
+        live_switch.grid(row=1, column=3, sticky="e", padx=2, pady=2)
 
         self.msg_label = ctk.CTkLabel(right, text="", anchor="center", font=ctk.CTkFont(size=12))
         self.msg_label.grid(row=2, column=0, pady=(10,4))
         self._update_color_previews()
 
     def _bind_resize(self):
-        self.bind("<Configure>", lambda e: self._update_preview_img())
+        self.bind("<Configure>", lambda e: self._agendar_preview())
+
+    def _agendar_preview(self):
+        # <Configure> dispara em rajada ao arrastar a janela: só o último conta
+        if self._preview_after is not None:
+            self.after_cancel(self._preview_after)
+        self._preview_after = self.after(PREVIEW_DEBOUNCE_MS, self._update_preview_img)
+
+    def _bind_live(self):
+        for var in (self.size_var, self.border_var, self.mod_style_var, self.error_correction_var,
+                    self.box_size_var, self.auto_resize_logo):
+            var.trace_add("write", lambda *_: self._ao_mudar())
+
+    def _ao_mudar(self):
+        # modo ao vivo: agrupa edições rápidas e regera só depois da pausa
+        if not self.live_var.get():
+            return
+        if self._live_after is not None:
+            self.after_cancel(self._live_after)
+        self._live_after = self.after(LIVE_DEBOUNCE_MS, self._gerar_live)
+
+    def _gerar_live(self):
+        self._live_after = None
+        try:
+            data, params = self._coletar_parametros()
+        except Exception:
+            return
+        if data:
+            # motor NumPy + render no tamanho exato (sem LANCZOS) mantêm a
+            # resposta abaixo de ~100ms mesmo em size=1024
+            params["engine"] = "numpy" if HAS_NUMPY else "styled"
+            params["render_mode"] = "exato"
+            self._iniciar_geracao(data, params)
 
     def _toggle_theme(self):
         mode = "light" if ctk.get_appearance_mode() == "Dark" else "dark"
@@ -365,6 +335,12 @@ class QRCodeApp(ctk.CTk):
             self.campos_dyn["cidade"] = cidade
             self.campos_dyn["valor"] = valor
 
+        for w in self.campos_dyn.values():
+            if isinstance(w, ctk.CTkComboBox):
+                w.configure(command=lambda _: self._ao_mudar())
+            else:
+                w.bind("<KeyRelease>", lambda e: self._ao_mudar())
+
     def _update_color_previews(self):
         # "Cor dos Quadradinhos" = self.bg_color
         # "Cor de Fundo" = self.fg_color
@@ -389,6 +365,7 @@ class QRCodeApp(ctk.CTk):
                 self.bg_color = color   # Cor dos quadradinhos
             self._update_color_previews()
             self._update_preview_img()
+            self._ao_mudar()
 
 
     def _selecionar_logo(self):
@@ -398,6 +375,7 @@ class QRCodeApp(ctk.CTk):
             self.logo_path = path
             self.logo_preview.configure(text=os.path.basename(path))
             self._update_preview_img()
+            self._ao_mudar()
 
     def _obter_dados(self):
         tipo = self.tipo_var.get()
@@ -418,58 +396,133 @@ class QRCodeApp(ctk.CTk):
             return get_pix_string(campos["chave"].get(), campos["nome"].get(), campos["cidade"].get(), campos["valor"].get())
         return ""
 
+    def _coletar_parametros(self):
+        data = self._obter_dados()
+        if not data or all([len(v.get())==0 for v in self.campos_dyn.values()]):
+            return None, None
+
+        # Extrai “L”, “M”, “Q” ou “H” do texto selecionado
+        ec_val = self.error_correction_var.get()
+        if "(" in ec_val:
+            ec_val = ec_val.split("(")[-1][0]
+        else:
+            ec_val = "H"
+
+        # variáveis do Tk são lidas aqui; a thread só recebe valores prontos
+        params = dict(
+            size=self.size_var.get(),
+            fg_color=self.fg_color,
+            bg_color=self.bg_color,
+            border=self.border_var.get(),
+            module_style=self.mod_style_var.get(),
+            logo_path=self.logo_path,
+            auto_resize_logo=self.auto_resize_logo.get(),
+            error_correction=ec_val,
+            box_size=self.box_size_var.get(),
+            # 1 bit / paleta quando o resultado é idêntico ao RGBA (sem logo nem reamostragem)
+            image_mode="auto",
+        )
+        return data, params
+
     def _gerar(self):
         try:
-            data = self._obter_dados()
-            if not data or all([len(v.get())==0 for v in self.campos_dyn.values()]):
+            data, params = self._coletar_parametros()
+            if not data:
                 self._mostrar_msg("Preencha os campos obrigatórios!", error=True)
                 return
-
-            # Extrai “L”, “M”, “Q” ou “H” do texto selecionado
-            ec_val = self.error_correction_var.get()
-            if "(" in ec_val:
-                ec_val = ec_val.split("(")[-1][0]
-            else:
-                ec_val = "H"
-
-            self.qr_img_pil = gerar_qrcode(
-                data,
-                size=self.size_var.get(),
-                fg_color=self.fg_color,
-                bg_color=self.bg_color,
-                border=self.border_var.get(),
-                module_style=self.mod_style_var.get(),
-                logo_path=self.logo_path,
-                auto_resize_logo=self.auto_resize_logo.get(),
-                error_correction=ec_val,
-                box_size=self.box_size_var.get()
-            )
+        except Exception as e:
+            self._mostrar_msg(f"Erro ao gerar QR: {e}", error=True)
+            return
+        self._iniciar_geracao(data, params)
+        self._mostrar_msg("Gerando QR Code...", error=False)
+
+    def _iniciar_geracao(self, data, params):
+        self._geracao += 1
+        self._pedido_atual = (data, params)
+        self._pendentes += 1
+        threading.Thread(
+            target=self._gerar_em_background, args=(self._geracao, data, params), daemon=True
+        ).start()
+        if self._pendentes == 1:
+            self.after(POLL_MS, self._receber_resultados)
+
+    def _gerar_em_background(self, geracao, data, params):
+        # Etapas separadas: codificar() só recodifica quando payload ou EC mudam
+        # (cache de matrizes); cor, tamanho, logo e estilo só re-renderizam.
+        # Entre as etapas, desiste se já houver um pedido mais novo.
+        try:
+            params = dict(params)
+            cod = codificar(data, params.pop("error_correction"))
+            if geracao != self._geracao:
+                self._resultados.put((geracao, None, None, None))
+                return
+            img = renderizar(cod, **params)
+            if geracao != self._geracao:
+                self._resultados.put((geracao, None, None, None))
+                return
+            alvo = min(PREVIEW_MAX, params["size"])
+            preview = _reduzir(img, alvo)
+            self._resultados.put((geracao, img, preview, None))
+        except Exception as e:
+            self._resultados.put((geracao, None, None, e))
+
+    def _receber_resultados(self):
+        while True:
+            try:
+                geracao, img, preview, erro = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+            if geracao != self._geracao:
+                continue  # já existe um pedido mais novo
+            if erro is not None:
+                self._mostrar_msg(f"Erro ao gerar QR: {erro}", error=True)
+                continue
+            self.qr_img_pil = img
+            self._ultimo_pedido = self._pedido_atual
+            self._preview_fonte, self._preview_pil = img, preview
             self._update_preview_img()
             self.save_btn.configure(state="normal")
             self.copy_btn.configure(state="normal")
             self._mostrar_msg("QR Code gerado com sucesso!", error=False)
-        except Exception as e:
-            self._mostrar_msg(f"Erro ao gerar QR: {e}", error=True)
+        if self._pendentes:
+            self.after(POLL_MS, self._receber_resultados)
 
     def _update_preview_img(self):
+        self._preview_after = None
         if self.qr_img_pil is not None:
             size = self.size_var.get()
-            img = self.qr_img_pil.resize((min(500, size), min(500, size)), Image.LANCZOS)
+            alvo = min(PREVIEW_MAX, size)
+            if self._preview_chave is not None and self._preview_chave[0] is self.qr_img_pil \
+                    and self._preview_chave[1] == alvo:
+                return
+            img = self._preview_pil
+            if self._preview_fonte is not self.qr_img_pil or img is None or img.size != (alvo, alvo):
+                img = _reduzir(self.qr_img_pil, alvo)
+                self._preview_fonte, self._preview_pil = self.qr_img_pil, img
             tk_img = ImageTk.PhotoImage(img)
             self.preview_canvas.configure(image=tk_img)
             self.preview_canvas.image = tk_img
+            self._preview_chave = (self.qr_img_pil, alvo)
 
     def _salvar(self):
         if self.qr_img_pil is None:
             self._mostrar_msg("Gere um QR antes de salvar.", error=True)
             return
 
-        ftypes = [("PNG", "*.png"), ("JPG", "*.jpg")]
+        ftypes = [("PNG", "*.png"), ("JPG", "*.jpg"), ("SVG", "*.svg"), ("PDF", "*.pdf")]
         f = filedialog.asksaveasfilename(defaultextension=".png", filetypes=ftypes)
         if not f: return
 
         try:
-            self.qr_img_pil.save(f)
+            if formato_de(f) == "svg":
+                # vetorial direto da matriz (sem logo)
+                data, params = self._ultimo_pedido
+                cod = codificar(data, params["error_correction"])
+                with open(f, "w", encoding="utf-8") as out:
+                    out.write(gerar_svg(cod, **{k: params[k] for k in SVG_OPCOES}))
+            else:
+                salvar_imagem(self.qr_img_pil, f)
             self._mostrar_msg(f"QR Code salvo em {f}", error=False)
         except Exception as e:
             self._mostrar_msg(f"Erro ao salvar: {e}", error=True)
@@ -478,9 +531,7 @@ class QRCodeApp(ctk.CTk):
         try:
             import base64
             import pyperclip
-            output = io.BytesIO()
-            self.qr_img_pil.save(output, format="PNG")
-            img_bytes = output.getvalue()
+            img_bytes = bytes_imagem(self.qr_img_pil, "png")
             b64data = base64.b64encode(img_bytes).decode()
             pyperclip.copy(b64data)
             self._mostrar_msg("QR (imagem) copiado em base64 para área de transferência!", error=False)
@@ -503,9 +554,11 @@ class QRCodeApp(ctk.CTk):
         self._limpar_preview()
 
     def _limpar_preview(self):
+        self._geracao += 1  # descarta gerações ainda em andamento
         self.preview_canvas.configure(image="")
         self.preview_canvas.image = None
         self.qr_img_pil = None
+        self._preview_fonte = self._preview_pil = self._preview_chave = None
         self.save_btn.configure(state="disabled")
         self.copy_btn.configure(state="disabled")
 
@@ -513,6 +566,12 @@ class QRCodeApp(ctk.CTk):
         color = "#e53e3e" if error else "#10B981"
         self.msg_label.configure(text=txt, text_color=color)
 
-if __name__ == "__main__":
+def main():
+    # configuração global do customtkinter só ao abrir a janela, não no import
+    ctk.set_appearance_mode("system")
+    ctk.set_default_color_theme("blue")
     app = QRCodeApp()
     app.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import unittest
+from importlib.util import find_spec
+
+# Orçamento de importação (qr_core.bench.ORCAMENTO_IMPORT): tempo de import
+# em interpretador novo e módulos pesados que não podem ser carregados.
+# Rodar com: python -m unittest discover -s tests
+
+@unittest.skipUnless(find_spec("PIL") and find_spec("qrcode"), "requer Pillow e qrcode")
+class TestImportacao(unittest.TestCase):
+    def test_orcamento(self):
+        from qr_core.bench import verificar_importacao
+
+        for r in verificar_importacao():
+            with self.subTest(modulo=r["modulo"]):
+                self.assertFalse(r["indevidos"], f"{r['modulo']} carrega {', '.join(r['indevidos'])}")
+                self.assertLessEqual(r["ms"], r["limite_ms"], f"{r['modulo']} importa em {r['ms']} ms")
+                self.assertTrue(r["ok"])
+
+if __name__ == "__main__":
+    unittest.main()
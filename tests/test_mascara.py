@@ -0,0 +1,74 @@
+import unittest
+from importlib.util import find_spec
+
+# A escolha de máscara com NumPy (qr_core.mascara) precisa dar a mesma matriz
+# que o qrcode, bit a bit. Se uma versão nova do qrcode mudar as regras de
+# penalidade ou das máscaras, estes testes acusam.
+
+PAYLOADS = (
+    "https://exemplo.com/produto/12345",
+    "WIFI:T:WPA;S:Loja Centro;P:senha-secreta-123;;",
+    "00020126360014br.gov.bcb.pix0114+5561999999999520400005303986",
+    "TEXTO EM MAIUSCULAS 0123456789 $%*+-./:",
+)
+VERSOES = (2, 5, 7, 9, 15, 22)  # 7+ têm os bits de informação de versão
+
+@unittest.skipUnless(find_spec("qrcode") and find_spec("numpy"), "requer qrcode e NumPy")
+class TestMascara(unittest.TestCase):
+    def _referencia(self, data, ec, versao, mask_pattern=None):
+        import qrcode
+
+        from qr_core.capacidade import dados_qr, planejar
+
+        # mesmos segmentos do planejador: a comparação isola a montagem e a máscara
+        plano = planejar(data, ec, versao)
+        qr = qrcode.QRCode(version=plano.version, error_correction=plano.error_correction, border=0,
+                           mask_pattern=mask_pattern)
+        for parte in dados_qr(plano):
+            qr.add_data(parte)
+        qr.make(fit=False)
+        return qr
+
+    def test_matriz_identica_ao_qrcode(self):
+        from qr_core.capacidade import planejar
+        from qr_core.render import codificar
+
+        for data in PAYLOADS:
+            for ec in "LMQH":
+                minima = planejar(data, ec).version
+                for versao in (minima,) + tuple(v for v in VERSOES if v > minima):
+                    with self.subTest(data=data[:20], ec=ec, versao=versao):
+                        cod = codificar(data, ec, versao, usar_cache=False)
+                        ref = self._referencia(data, ec, versao)
+                        self.assertEqual(cod.version, ref.version)
+                        self.assertEqual([list(linha) for linha in cod.modules], ref.modules)
+
+    def test_mascara_fixa(self):
+        from qr_core.render import codificar
+
+        for k in range(8):
+            with self.subTest(mascara=k):
+                cod = codificar(PAYLOADS[0], "M", 7, usar_cache=False, mask_pattern=k)
+                ref = self._referencia(PAYLOADS[0], "M", 7, mask_pattern=k)
+                self.assertEqual([list(linha) for linha in cod.modules], ref.modules)
+
+    def test_penalidade_igual_lost_point(self):
+        import numpy as np
+        from qrcode import util
+
+        from qr_core.mascara import penalidade
+
+        for versao in (4, 7, 22):
+            for k in range(8):
+                with self.subTest(versao=versao, mascara=k):
+                    m = self._referencia(PAYLOADS[1], "Q", versao, mask_pattern=k).modules
+                    self.assertEqual(penalidade(np.array(m, dtype=bool)), util.lost_point(m))
+
+    def test_mascara_invalida(self):
+        from qr_core.render import codificar
+
+        with self.assertRaises(ValueError):
+            codificar(PAYLOADS[0], "M", usar_cache=False, mask_pattern=8)
+
+if __name__ == "__main__":
+    unittest.main()
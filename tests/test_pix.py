@@ -0,0 +1,62 @@
+import unittest
+
+from qr_core.pix import PixRecebedor, crc16, formatar_valor, recebedor
+
+# BR Code do PIX montado nativamente (qr_core.pix). O exemplo de referência é
+# o do manual do BR Code do Banco Central (chave aleatória, sem valor).
+
+REFERENCIA_BCB = (
+    "00020126580014br.gov.bcb.pix0136123e4567-e12b-12d1-a456-426655440000"
+    "5204000053039865802BR5913Fulano de Tal6008BRASILIA62070503***63041D3D"
+)
+
+class TestCrc(unittest.TestCase):
+    def test_check_ccitt_false(self):
+        # valor de verificação padrão do CRC-16/CCITT-FALSE
+        self.assertEqual(crc16(b"123456789"), 0x29B1)
+
+class TestPayload(unittest.TestCase):
+    def test_referencia_bcb(self):
+        payload = recebedor("123e4567-e12b-12d1-a456-426655440000", "Fulano de Tal", "BRASILIA").payload()
+        self.assertEqual(payload, REFERENCIA_BCB)
+        self.assertEqual(payload[-4:], "1D3D")
+
+    def test_crc_do_payload(self):
+        payload = recebedor("a@b.com", "Loja", "Recife").payload("12.5", "PEDIDO42")
+        self.assertEqual(payload[-8:-4], "6304")
+        self.assertEqual(f"{crc16(payload[:-4].encode()):04X}", payload[-4:])
+        self.assertIn("540512.50", payload)
+        self.assertIn("62120508PEDIDO42", payload)
+
+    def test_acentos_removidos(self):
+        payload = recebedor("a@b.com", "José Ação", "São Paulo").payload()
+        self.assertIn("5909Jose Acao", payload)
+        self.assertIn("6009Sao Paulo", payload)
+        self.assertTrue(payload.isascii())
+
+    def test_campos_invalidos(self):
+        for chave, nome, cidade in (("", "Loja", "Recife"), ("a@b.com", "", "Recife"),
+                                    ("a@b.com", "Loja", "C" * 16), ("a@b.com", "N" * 26, "Recife")):
+            with self.subTest(chave=chave, nome=nome, cidade=cidade):
+                with self.assertRaises(ValueError):
+                    PixRecebedor(chave, nome, cidade)
+        with self.assertRaises(ValueError):
+            recebedor("a@b.com", "Loja", "Recife").payload(txid="com espaço")
+
+class TestValor(unittest.TestCase):
+    def test_formatos_aceitos(self):
+        self.assertIsNone(formatar_valor(None))
+        self.assertIsNone(formatar_valor(""))
+        self.assertEqual(formatar_valor("10"), "10.00")
+        self.assertEqual(formatar_valor("10,5"), "10.50")
+        self.assertEqual(formatar_valor("1.500"), "1.50")
+        self.assertEqual(formatar_valor("9999999999.99"), "9999999999.99")
+
+    def test_rejeitados(self):
+        for valor in ("1.005", "0.001", "0", "0.00", "-1", "nan", "inf", "abc", "10000000000", "1e30"):
+            with self.subTest(valor=valor):
+                with self.assertRaises(ValueError):
+                    formatar_valor(valor)
+
+if __name__ == "__main__":
+    unittest.main()